@@ -20,7 +20,7 @@ from libs.helper import email as email_validate
 from libs.password import hash_password, password_pattern, valid_password
 from libs.rsa import generate_key_pair
 from models import Tenant
-from models.dataset import Dataset, DatasetCollectionBinding, DocumentSegment
+from models.dataset import Dataset, DatasetCollectionBinding, DocumentSegment, Embedding
 from models.dataset import Document as DatasetDocument
 from models.model import Account, App, AppAnnotationSetting, AppMode, Conversation, MessageAnnotation
 from models.provider import Provider, ProviderModel
@@ -640,6 +640,111 @@ where sites.id is null limit 1000"""
     click.echo(click.style("Fix for missing app-related sites completed successfully!", fg="green"))
 
 
+@click.command("migrate-embedding-cache-format", help="Rewrite cached embeddings into the compact float32 format.")
+@click.option("--batch-size", default=1000, prompt=False, help="Number of embedding rows processed per batch.")
+def migrate_embedding_cache_format(batch_size: int):
+    """
+    Rewrite pickled rows of the embeddings cache table into the compact float32 format.
+    Rows are scanned in primary key order, so the migration can be interrupted and re-run safely.
+    """
+    click.echo(click.style("Starting embedding cache format migration.", fg="green"))
+    lock = redis_client.lock(name="embedding_cache_format_migration_lock", timeout=3600)
+    if not lock.acquire(blocking=False):
+        click.echo("Embedding cache format migration is already running, skipped.")
+        return
+
+    migrated_count = 0
+    skipped_count = 0
+    failed_count = 0
+    last_id = None
+    try:
+        while True:
+            query = db.session.query(Embedding)
+            if last_id:
+                query = query.filter(Embedding.id > last_id)
+            embeddings = query.order_by(Embedding.id).limit(batch_size).all()
+            if not embeddings:
+                break
+            last_id = embeddings[-1].id
+
+            for embedding in embeddings:
+                if not embedding.is_legacy_format():
+                    skipped_count += 1
+                    continue
+                try:
+                    embedding.set_embedding(embedding.get_embedding())
+                    migrated_count += 1
+                except Exception as e:
+                    failed_count += 1
+                    logging.exception(f"Failed to migrate embedding {embedding.id}, error: {e}")
+            db.session.commit()
+            db.session.expunge_all()
+            click.echo(f"Processed up to embedding {last_id}. {migrated_count} migrated, {skipped_count} skipped.")
+            lock.reacquire()
+    finally:
+        lock.release()
+
+    click.echo(
+        click.style(
+            f"Embedding cache format migration completed. {migrated_count} migrated, "
+            f"{skipped_count} skipped, {failed_count} failed.",
+            fg="green",
+        )
+    )
+
+
+@click.command("migrate-keyword-postings", help="Migrate dataset keyword tables to keyword postings.")
+def migrate_keyword_postings():
+    """
+    Copy serialized dataset keyword tables into the per-keyword postings table used by the jieba_postings store.
+    """
+    from core.rag.datasource.keyword.jieba.jieba_postings import JiebaPostings
+
+    click.echo(click.style("Starting keyword postings migration.", fg="green"))
+    migrated_count = 0
+    skipped_count = 0
+    page = 1
+    while True:
+        try:
+            datasets = (
+                db.session.query(Dataset)
+                .filter(Dataset.indexing_technique == "economy")
+                .order_by(Dataset.created_at.desc())
+                .paginate(page=page, per_page=50)
+            )
+        except NotFound:
+            break
+
+        page += 1
+        for dataset in datasets:
+            try:
+                dataset_keyword_table = dataset.dataset_keyword_table
+                keyword_table_dict = dataset_keyword_table.keyword_table_dict if dataset_keyword_table else None
+                if not keyword_table_dict:
+                    skipped_count += 1
+                    continue
+                click.echo(f"Migrating keyword table of dataset {dataset.id}.")
+                JiebaPostings(dataset).add_keyword_table(keyword_table_dict["__data__"]["table"])
+                migrated_count += 1
+            except Exception as e:
+                db.session.rollback()
+                click.echo(
+                    click.style(
+                        "Migrate keyword table of dataset {} error: {} {}".format(
+                            dataset.id, e.__class__.__name__, str(e)
+                        ),
+                        fg="red",
+                    )
+                )
+
+    click.echo(
+        click.style(
+            f"Keyword postings migration completed. {migrated_count} migrated, {skipped_count} skipped.",
+            fg="green",
+        )
+    )
+
+
 def register_commands(app):
     app.cli.add_command(reset_password)
     app.cli.add_command(reset_email)
@@ -650,3 +755,5 @@ def register_commands(app):
     app.cli.add_command(create_tenant)
     app.cli.add_command(upgrade_db)
     app.cli.add_command(fix_app_site_missing)
+    app.cli.add_command(migrate_embedding_cache_format)
+    app.cli.add_command(migrate_keyword_postings)
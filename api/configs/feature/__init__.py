@@ -62,6 +62,22 @@ class AppExecutionConfig(BaseSettings):
         default=0,
     )
 
+    APP_STOP_FLAG_CHECK_INTERVAL_MS: NonNegativeInt = Field(
+        description="Minimum interval in milliseconds between two checks of a running task's stop flag in Redis",
+        default=500,
+    )
+
+    MESSAGE_TOKENS_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of token counts of history messages cached in process memory per worker"
+        " (0 to disable)",
+        default=10000,
+    )
+
+    MESSAGE_TOKENS_CACHE_TTL: NonNegativeInt = Field(
+        description="Time-to-live in seconds for token counts of history messages cached in Redis (0 to disable)",
+        default=86400,
+    )
+
 
 class CodeExecutionSandboxConfig(BaseSettings):
     """
@@ -93,6 +109,26 @@ class CodeExecutionSandboxConfig(BaseSettings):
         default=10.0,
     )
 
+    CODE_EXECUTION_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of concurrent connections to the code execution service per process",
+        default=100,
+    )
+
+    CODE_EXECUTION_POOL_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of idle keep-alive connections to the code execution service per process",
+        default=20,
+    )
+
+    CODE_EXECUTION_POOL_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        description="Time in seconds an idle keep-alive connection to the code execution service is kept open",
+        default=5.0,
+    )
+
+    CODE_EXECUTION_BATCH_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of concurrent sandbox calls when executing a batch of code inputs",
+        default=10,
+    )
+
     CODE_MAX_NUMBER: PositiveInt = Field(
         description="Maximum allowed numeric value in code execution",
         default=9223372036854775807,
@@ -403,6 +439,27 @@ class WorkflowConfig(BaseSettings):
         default=200 * 1024,
     )
 
+    WORKFLOW_SCHEDULER_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of threads per worker process running parallel branches and iterations"
+        " of all workflow runs",
+        default=100,
+    )
+
+    WORKFLOW_SCHEDULER_MAX_WORKERS_PER_TENANT: PositiveInt = Field(
+        description="Maximum number of workflow scheduler threads a single tenant can use at the same time",
+        default=50,
+    )
+
+    WORKFLOW_SCHEDULER_MAX_WORKERS_PER_APP: PositiveInt = Field(
+        description="Maximum number of workflow scheduler threads a single app can use at the same time",
+        default=20,
+    )
+
+    WORKFLOW_GRAPH_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled workflow graphs cached in process memory per worker (0 to disable)",
+        default=200,
+    )
+
 
 class AuthConfig(BaseSettings):
     """
@@ -450,6 +507,11 @@ class ModerationConfig(BaseSettings):
         default=300,
     )
 
+    MODERATION_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of threads per worker process moderating streamed outputs of all requests",
+        default=20,
+    )
+
 
 class ToolConfig(BaseSettings):
     """
@@ -534,6 +596,37 @@ class RagEtlConfig(BaseSettings):
         default="dify",
     )
 
+    PDF_EXTRACT_MAX_WORKERS: NonNegativeInt = Field(
+        description="Maximum number of worker processes extracting the pages of large PDF files in parallel,"
+        " 0 to extract them in the current process",
+        default=0,
+    )
+
+    PDF_EXTRACT_PARALLEL_MIN_PAGES: PositiveInt = Field(
+        description="Minimum number of pages of a PDF file to extract its pages in worker processes",
+        default=100,
+    )
+
+    PDF_EXTRACT_PAGES_PER_TASK: PositiveInt = Field(
+        description="Number of pages of a PDF file extracted by a worker process per task",
+        default=20,
+    )
+
+    EXTRACT_CACHE_ENABLED: bool = Field(
+        description="Enable caching extracted documents in storage, keyed by the hash of the file content",
+        default=True,
+    )
+
+    EXTRACT_CACHE_MIN_FILE_SIZE: NonNegativeInt = Field(
+        description="Minimum size in bytes of an uploaded file for its extracted documents to be cached",
+        default=512 * 1024,
+    )
+
+    EXTRACT_CACHE_MAX_CONTENT_LENGTH: PositiveInt = Field(
+        description="Maximum total length in characters of the text extracted from a file for it to be cached",
+        default=10 * 1024 * 1024,
+    )
+
     KEYWORD_DATA_SOURCE_TYPE: str = Field(
         description="Data source type for keyword extraction"
         " ('database' or other supported types), default to 'database'",
@@ -571,6 +664,16 @@ class DataSetConfig(BaseSettings):
         default=False,
     )
 
+    QUERY_EMBEDDING_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of query embeddings cached in process memory per worker (0 to disable)",
+        default=1000,
+    )
+
+    QUERY_EMBEDDING_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds for query embeddings cached in process memory",
+        default=600,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -58,10 +58,23 @@ class VectorStoreConfig(BaseSettings):
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
         description="Method for keyword extraction and storage."
-        " Default is 'jieba', a Chinese text segmentation library.",
+        " Default is 'jieba', a Chinese text segmentation library."
+        " Use 'jieba_postings' to store one posting row per keyword instead of a serialized keyword table.",
         default="jieba",
     )
 
+    KEYWORD_TABLE_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of parsed dataset keyword tables cached in process memory per worker"
+        " (0 to disable).",
+        default=100,
+    )
+
+    DOCUMENT_KEYWORDS_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of document keyword extraction results cached in process memory per worker"
+        " for keyword scoring (0 to disable).",
+        default=10000,
+    )
+
 
 class DatabaseConfig:
     DB_HOST: str = Field(
@@ -24,6 +24,9 @@ class PublishFrom(Enum):
 
 
 class AppQueueManager:
+    # max messages yielded in a row by `listen` before it checks the timeout and stop flag again
+    LISTEN_BATCH_SIZE = 100
+
     def __init__(self, task_id: str, user_id: str, invoke_from: InvokeFrom) -> None:
         if not user_id:
             raise ValueError("user is required")
@@ -41,6 +44,10 @@ class AppQueueManager:
 
         self._q = q
 
+        self._stopped = False
+        self._stop_check_interval = dify_config.APP_STOP_FLAG_CHECK_INTERVAL_MS / 1000
+        self._last_stop_check_time = 0.0
+
     def listen(self) -> Generator:
         """
         Listen to queue
@@ -51,12 +58,18 @@ class AppQueueManager:
         start_time = time.time()
         last_ping_time = 0
         while True:
+            listen_finished = False
             try:
                 message = self._q.get(timeout=1)
-                if message is None:
-                    break
-
-                yield message
+                # drain the messages already queued, the checks below run once per batch
+                for i in range(self.LISTEN_BATCH_SIZE):
+                    if i > 0:
+                        message = self._q.get_nowait()
+                    if message is None:
+                        listen_finished = True
+                        break
+
+                    yield message
             except queue.Empty:
                 continue
             finally:
@@ -72,6 +85,9 @@ class AppQueueManager:
                     self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
                     last_ping_time = elapsed_time // 10
 
+            if listen_finished:
+                break
+
     def stop_listen(self) -> None:
         """
         Stop listen to queue
@@ -127,12 +143,21 @@ class AppQueueManager:
 
     def _is_stopped(self) -> bool:
         """
-        Check if task is stopped
+        Check if task is stopped, the stop flag is read from Redis at most once per APP_STOP_FLAG_CHECK_INTERVAL_MS
         :return:
         """
+        if self._stopped:
+            return True
+
+        now = time.monotonic()
+        if now - self._last_stop_check_time < self._stop_check_interval:
+            return False
+        self._last_stop_check_time = now
+
         stopped_cache_key = AppQueueManager._generate_stopped_cache_key(self._task_id)
         result = redis_client.get(stopped_cache_key)
         if result is not None:
+            self._stopped = True
             return True
 
         return False
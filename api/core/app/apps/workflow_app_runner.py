@@ -53,9 +53,11 @@ class WorkflowBasedAppRunner(AppRunner):
     def __init__(self, queue_manager: AppQueueManager):
         self.queue_manager = queue_manager
 
-    def _init_graph(self, graph_config: Mapping[str, Any]) -> Graph:
+    def _init_graph(self, graph_config: Mapping[str, Any], cache_key: Optional[str] = None) -> Graph:
         """
         Init graph
+        :param graph_config: graph config
+        :param cache_key: key identifying the graph config, compiled graphs are shared per process by this key
         """
         if "nodes" not in graph_config or "edges" not in graph_config:
             raise ValueError("nodes or edges not found in workflow graph")
@@ -66,7 +68,7 @@ class WorkflowBasedAppRunner(AppRunner):
         if not isinstance(graph_config.get("edges"), list):
             raise ValueError("edges in workflow graph must be a list")
         # init graph
-        graph = Graph.init(graph_config=graph_config)
+        graph = Graph.init(graph_config=graph_config, cache_key=cache_key)
 
         if not graph:
             raise ValueError("graph not found in workflow")
@@ -10,10 +10,27 @@ from extensions.ext_redis import redis_client
 
 logger = logging.getLogger(__name__)
 
+# Atomically reap timed out requests and admit a request if the app is under its limit.
+# KEYS[1]: sorted set of active request ids scored by their enter time
+# ARGV: request id, now, max alive time, max active requests, key ttl
+# Returns the number of active requests including the admitted one, or -1 if the limit is reached.
+_ENTER_SCRIPT = """
+local now = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[3]))
+local active_requests_count = redis.call('ZCARD', KEYS[1])
+if active_requests_count >= tonumber(ARGV[4]) then
+    return -1
+end
+redis.call('ZADD', KEYS[1], now, ARGV[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return active_requests_count + 1
+"""
+
 
 class RateLimit:
     _MAX_ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:max_active_requests"
-    _ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:active_requests"
+    # sorted set, the former hash at "dify:rate_limit:{}:active_requests" expires by itself
+    _ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:active_requests_by_time"
     _UNLIMITED_REQUEST_ID = "unlimited_request_id"
     _REQUEST_MAX_ALIVE_TIME = 10 * 60  # 10 minutes
     _ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL = 5 * 60  # recalculate request_count from request_detail every 5 minutes
@@ -34,6 +51,7 @@ class RateLimit:
         self.active_requests_key = self._ACTIVE_REQUESTS_KEY.format(client_id)
         self.max_active_requests_key = self._MAX_ACTIVE_REQUESTS_KEY.format(client_id)
         self.last_recalculate_time = float("-inf")
+        self.enter_script = redis_client.register_script(_ENTER_SCRIPT)
         self.flush_cache(use_local_value=True)
 
     def flush_cache(self, use_local_value=False):
@@ -49,18 +67,7 @@ class RateLimit:
                 self.max_active_requests = int(redis_client.get(self.max_active_requests_key).decode("utf-8"))
                 redis_client.expire(self.max_active_requests_key, timedelta(days=1))
 
-        # flush max active requests (in-transit request list)
-        if not redis_client.exists(self.active_requests_key):
-            return
-        request_details = redis_client.hgetall(self.active_requests_key)
-        redis_client.expire(self.active_requests_key, timedelta(days=1))
-        timeout_requests = [
-            k
-            for k, v in request_details.items()
-            if time.time() - float(v.decode("utf-8")) > RateLimit._REQUEST_MAX_ALIVE_TIME
-        ]
-        if timeout_requests:
-            redis_client.hdel(self.active_requests_key, *timeout_requests)
+        # timed out in-transit requests are reaped on every enter
 
     def enter(self, request_id: Optional[str] = None) -> str:
         if time.time() - self.last_recalculate_time > RateLimit._ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL:
@@ -70,19 +77,33 @@ class RateLimit:
         if not request_id:
             request_id = RateLimit.gen_request_key()
 
-        active_requests_count = redis_client.hlen(self.active_requests_key)
-        if active_requests_count >= self.max_active_requests:
+        active_requests_count = self.enter_script(
+            keys=[self.active_requests_key],
+            args=[
+                request_id,
+                time.time(),
+                RateLimit._REQUEST_MAX_ALIVE_TIME,
+                self.max_active_requests,
+                int(timedelta(days=1).total_seconds()),
+            ],
+        )
+        if active_requests_count < 0:
             raise AppInvokeQuotaExceededError(
                 "Too many requests. Please try again later. The current maximum "
                 "concurrent requests allowed is {}.".format(self.max_active_requests)
             )
-        redis_client.hset(self.active_requests_key, request_id, str(time.time()))
         return request_id
 
     def exit(self, request_id: str):
         if request_id == RateLimit._UNLIMITED_REQUEST_ID:
             return
-        redis_client.hdel(self.active_requests_key, request_id)
+        redis_client.zrem(self.active_requests_key, request_id)
+
+    def get_active_requests_count(self) -> int:
+        """
+        Get the number of in-transit requests of the client, requests older than the max alive time are not counted
+        """
+        return redis_client.zcount(self.active_requests_key, time.time() - RateLimit._REQUEST_MAX_ALIVE_TIME, "+inf")
 
     @staticmethod
     def gen_request_key() -> str:
@@ -1,9 +1,11 @@
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from threading import Lock
 from typing import Optional
 
-from httpx import Timeout, post
+from httpx import Client, Limits, Timeout
 from pydantic import BaseModel
 from yarl import URL
 
@@ -54,6 +56,30 @@ class CodeExecutor:
 
     supported_dependencies_languages: set[CodeLanguage] = {CodeLanguage.PYTHON3}
 
+    _http_client: Optional[Client] = None
+    _http_client_lock = Lock()
+
+    @classmethod
+    def get_http_client(cls) -> Client:
+        """
+        Get the process-wide pooled client to the sandbox service, keeping connections alive between executions
+        """
+        if cls._http_client is None:
+            with cls._http_client_lock:
+                if cls._http_client is None:
+                    cls._http_client = Client(
+                        limits=Limits(
+                            max_connections=dify_config.CODE_EXECUTION_POOL_MAX_CONNECTIONS,
+                            max_keepalive_connections=dify_config.CODE_EXECUTION_POOL_MAX_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=dify_config.CODE_EXECUTION_POOL_KEEPALIVE_EXPIRY,
+                        ),
+                    )
+        return cls._http_client
+
+    @classmethod
+    def reset_http_client(cls) -> None:
+        cls._http_client = None
+
     @classmethod
     def execute_code(cls, language: CodeLanguage, preload: str, code: str) -> str:
         """
@@ -74,7 +100,7 @@ class CodeExecutor:
         }
 
         try:
-            response = post(
+            response = cls.get_http_client().post(
                 str(url),
                 json=data,
                 headers=headers,
@@ -82,7 +108,8 @@ class CodeExecutor:
                     connect=dify_config.CODE_EXECUTION_CONNECT_TIMEOUT,
                     read=dify_config.CODE_EXECUTION_READ_TIMEOUT,
                     write=dify_config.CODE_EXECUTION_WRITE_TIMEOUT,
-                    pool=None,
+                    # waiting for a free pooled connection is bounded like establishing a new one
+                    pool=dify_config.CODE_EXECUTION_CONNECT_TIMEOUT,
                 ),
             )
             if response.status_code == 503:
@@ -137,3 +164,31 @@ class CodeExecutor:
             raise e
 
         return template_transformer.transform_response(response)
+
+    @classmethod
+    def execute_workflow_code_template_batch(
+        cls, language: CodeLanguage, code: str, inputs_list: list[dict]
+    ) -> list[dict]:
+        """
+        Execute the same code against many input sets
+        :param language: code language
+        :param code: code
+        :param inputs_list: list of inputs
+        :return: outputs in the order of inputs_list
+        """
+        if not inputs_list:
+            return []
+        if len(inputs_list) == 1:
+            return [cls.execute_workflow_code_template(language, code, inputs_list[0])]
+
+        # the sandbox runs one script per request, so the batch is fanned out over the pooled connections
+        max_workers = min(dify_config.CODE_EXECUTION_BATCH_MAX_WORKERS, len(inputs_list))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="code_executor") as executor:
+            futures = [
+                executor.submit(cls.execute_workflow_code_template, language, code, inputs) for inputs in inputs_list
+            ]
+            return [future.result() for future in futures]
+
+
+# pooled sandbox connections must not be shared with forked worker processes
+os.register_at_fork(after_in_child=CodeExecutor.reset_http_client)
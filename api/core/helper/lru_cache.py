@@ -1,22 +1,59 @@
+import threading
+import time
 from collections import OrderedDict
-from typing import Any
+from typing import Any, Optional
 
 
 class LRUCache:
-    def __init__(self, capacity: int):
+    def __init__(self, capacity: int, ttl: Optional[float] = None):
+        """
+        Thread-safe LRU cache.
+
+        :param capacity: max number of entries kept, 0 disables the cache
+        :param ttl: optional time to live of an entry in seconds
+        """
         self.cache = OrderedDict()
         self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
 
     def get(self, key: Any) -> Any:
-        if key not in self.cache:
-            return None
-        else:
+        with self._lock:
+            if key not in self.cache:
+                self.misses += 1
+                return None
+            expires_at, value = self.cache[key]
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self.cache[key]
+                self.misses += 1
+                return None
             self.cache.move_to_end(key)  # move the key to the end of the OrderedDict
-            return self.cache[key]
+            self.hits += 1
+            return value
 
     def put(self, key: Any, value: Any) -> None:
-        if key in self.cache:
-            self.cache.move_to_end(key)
-        self.cache[key] = value
-        if len(self.cache) > self.capacity:
-            self.cache.popitem(last=False)  # pop the first item
+        if self.capacity <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            self.cache[key] = (expires_at, value)
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)  # pop the first item
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self.cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self.cache), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
@@ -4,7 +4,9 @@ Proxy requests to avoid SSRF
 
 import logging
 import os
+import threading
 import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 
 import httpx
 
@@ -12,38 +14,103 @@ SSRF_PROXY_ALL_URL = os.getenv("SSRF_PROXY_ALL_URL", "")
 SSRF_PROXY_HTTP_URL = os.getenv("SSRF_PROXY_HTTP_URL", "")
 SSRF_PROXY_HTTPS_URL = os.getenv("SSRF_PROXY_HTTPS_URL", "")
 SSRF_DEFAULT_MAX_RETRIES = int(os.getenv("SSRF_DEFAULT_MAX_RETRIES", "3"))
-
-proxy_mounts = (
-    {
-        "http://": httpx.HTTPTransport(proxy=SSRF_PROXY_HTTP_URL),
-        "https://": httpx.HTTPTransport(proxy=SSRF_PROXY_HTTPS_URL),
-    }
-    if SSRF_PROXY_HTTP_URL and SSRF_PROXY_HTTPS_URL
-    else None
-)
+SSRF_POOL_MAX_CONNECTIONS = int(os.getenv("SSRF_POOL_MAX_CONNECTIONS", "100"))
+SSRF_POOL_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SSRF_POOL_MAX_KEEPALIVE_CONNECTIONS", "20"))
+SSRF_POOL_KEEPALIVE_EXPIRY = float(os.getenv("SSRF_POOL_KEEPALIVE_EXPIRY", "5.0"))
 
 BACKOFF_FACTOR = 0.5
 STATUS_FORCELIST = [429, 500, 502, 503, 504]
 
+_pool_limits = httpx.Limits(
+    max_connections=SSRF_POOL_MAX_CONNECTIONS,
+    max_keepalive_connections=SSRF_POOL_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=SSRF_POOL_KEEPALIVE_EXPIRY,
+)
 
-def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+_client_lock = threading.Lock()
+_client: httpx.Client | None = None
+
+# request counters of the pooled client, kept here rather than read from the httpx pool internals
+_stats_lock = threading.Lock()
+_request_stats = {"requests": 0, "in_flight": 0, "retries": 0}
+
+
+def _no_cookie_jar() -> CookieJar:
+    # pooled clients are shared by every tenant, so response cookies must never be persisted
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+def _client_kwargs() -> dict:
+    if SSRF_PROXY_ALL_URL:
+        return {"proxy": SSRF_PROXY_ALL_URL, "limits": _pool_limits}
+    elif SSRF_PROXY_HTTP_URL and SSRF_PROXY_HTTPS_URL:
+        return {
+            "mounts": {
+                "http://": httpx.HTTPTransport(proxy=SSRF_PROXY_HTTP_URL, limits=_pool_limits),
+                "https://": httpx.HTTPTransport(proxy=SSRF_PROXY_HTTPS_URL, limits=_pool_limits),
+            }
+        }
+    else:
+        return {"limits": _pool_limits}
+
+
+def get_client() -> httpx.Client:
+    """
+    Get the process-wide pooled client for the configured SSRF proxy.
+    Connections are kept alive and reused across requests and retries.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(cookies=_no_cookie_jar(), **_client_kwargs())
+    return _client
+
+
+def _reset_clients():
+    global _client
+    _client = None
+    with _stats_lock:
+        _request_stats.update(requests=0, in_flight=0, retries=0)
+
+
+# connections must not be shared with forked worker processes
+os.register_at_fork(after_in_child=_reset_clients)
+
+
+def _update_stats(**deltas: int):
+    with _stats_lock:
+        for key, delta in deltas.items():
+            _request_stats[key] += delta
+
+
+def get_pool_stats() -> dict[str, int]:
+    """
+    Get usage metrics of the pooled SSRF proxy client in this process.
+    """
+    with _stats_lock:
+        stats = dict(_request_stats)
+    stats["max_connections"] = SSRF_POOL_MAX_CONNECTIONS
+    stats["max_keepalive_connections"] = SSRF_POOL_MAX_KEEPALIVE_CONNECTIONS
+    return stats
+
+
+def _normalize_kwargs(kwargs: dict) -> dict:
     if "allow_redirects" in kwargs:
         allow_redirects = kwargs.pop("allow_redirects")
         if "follow_redirects" not in kwargs:
             kwargs["follow_redirects"] = allow_redirects
+    return kwargs
+
+
+def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+    kwargs = _normalize_kwargs(kwargs)
 
     retries = 0
     while retries <= max_retries:
+        _update_stats(requests=1, in_flight=1)
         try:
-            if SSRF_PROXY_ALL_URL:
-                with httpx.Client(proxy=SSRF_PROXY_ALL_URL) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            elif proxy_mounts:
-                with httpx.Client(mounts=proxy_mounts) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            else:
-                with httpx.Client() as client:
-                    response = client.request(method=method, url=url, **kwargs)
+            response = get_client().request(method=method, url=url, **kwargs)
 
             if response.status_code not in STATUS_FORCELIST:
                 return response
@@ -52,9 +119,12 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
 
         except httpx.RequestError as e:
             logging.warning(f"Request to URL {url} failed on attempt {retries + 1}: {e}")
+        finally:
+            _update_stats(in_flight=-1)
 
         retries += 1
         if retries <= max_retries:
+            _update_stats(retries=1)
             time.sleep(BACKOFF_FACTOR * (2 ** (retries - 1)))
 
     raise Exception(f"Reached maximum retries ({max_retries}) for URL {url}")
@@ -6,6 +6,7 @@ import re
 import threading
 import time
 import uuid
+from collections.abc import Iterable, Iterator
 from typing import Optional, cast
 
 from flask import Flask, current_app
@@ -16,8 +17,10 @@ from configs import dify_config
 from core.errors.error import ProviderTokenNotInitError
 from core.llm_generator.llm_generator import LLMGenerator
 from core.model_manager import ModelInstance, ModelManager
-from core.model_runtime.entities.model_entities import ModelType
+from core.model_runtime.entities.model_entities import ModelPropertyKey, ModelType
+from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.rag.datasource.keyword.keyword_factory import Keyword
+from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.docstore.dataset_docstore import DatasetDocumentStore
 from core.rag.extractor.entity.extract_setting import ExtractSetting
 from core.rag.index_processor.index_processor_base import BaseIndexProcessor
@@ -39,6 +42,15 @@ from services.feature_service import FeatureService
 
 
 class IndexingRunner:
+    # number of threads loading the chunks of a document into the index
+    LOAD_MAX_WORKERS = 10
+    # minimum number of documents per chunk
+    LOAD_MIN_CHUNK_SIZE = 10
+    # number of chunks per load worker the documents are split into at least, when there are enough documents
+    LOAD_CHUNKS_PER_WORKER = 4
+    # number of indexed segments marked as completed per update
+    SEGMENT_STATUS_UPDATE_BATCH_SIZE = 500
+
     def __init__(self):
         self.storage = storage
         self.model_manager = ModelManager()
@@ -290,7 +302,11 @@ class IndexingRunner:
 
     def _extract(
         self, index_processor: BaseIndexProcessor, dataset_document: DatasetDocument, process_rule: dict
-    ) -> list[Document]:
+    ) -> Iterable[Document]:
+        """
+        Extract the documents of a dataset document lazily, so they are cleaned and split
+        while the rest of the file is extracted.
+        """
         # load file
         if dataset_document.data_source_type not in {"upload_file", "notion_import", "website_crawl"}:
             return []
@@ -309,7 +325,7 @@ class IndexingRunner:
                 extract_setting = ExtractSetting(
                     datasource_type="upload_file", upload_file=file_detail, document_model=dataset_document.doc_form
                 )
-                text_docs = index_processor.extract(extract_setting, process_rule_mode=process_rule["mode"])
+                text_docs = index_processor.extract_iter(extract_setting, process_rule_mode=process_rule["mode"])
         elif dataset_document.data_source_type == "notion_import":
             if (
                 not data_source_info
@@ -328,7 +344,7 @@ class IndexingRunner:
                 },
                 document_model=dataset_document.doc_form,
             )
-            text_docs = index_processor.extract(extract_setting, process_rule_mode=process_rule["mode"])
+            text_docs = index_processor.extract_iter(extract_setting, process_rule_mode=process_rule["mode"])
         elif dataset_document.data_source_type == "website_crawl":
             if (
                 not data_source_info
@@ -349,25 +365,31 @@ class IndexingRunner:
                 },
                 document_model=dataset_document.doc_form,
             )
-            text_docs = index_processor.extract(extract_setting, process_rule_mode=process_rule["mode"])
-        # update document status to splitting
+            text_docs = index_processor.extract_iter(extract_setting, process_rule_mode=process_rule["mode"])
+
+        return self._iter_extracted_documents(dataset_document, text_docs)
+
+    def _iter_extracted_documents(
+        self, dataset_document: DatasetDocument, text_docs: Iterable[Document]
+    ) -> Iterator[Document]:
+        word_count = 0
+        for text_doc in text_docs:
+            # replace doc id to document model id
+            text_doc.metadata["document_id"] = dataset_document.id
+            text_doc.metadata["dataset_id"] = dataset_document.dataset_id
+            word_count += len(text_doc.page_content)
+            yield text_doc
+
+        # update document status to splitting once the whole file is extracted
         self._update_document_index_status(
             document_id=dataset_document.id,
             after_indexing_status="splitting",
             extra_update_params={
-                DatasetDocument.word_count: sum(len(text_doc.page_content) for text_doc in text_docs),
+                DatasetDocument.word_count: word_count,
                 DatasetDocument.parsing_completed_at: datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
             },
         )
 
-        # replace doc id to document model id
-        text_docs = cast(list[Document], text_docs)
-        for text_doc in text_docs:
-            text_doc.metadata["document_id"] = dataset_document.id
-            text_doc.metadata["dataset_id"] = dataset_document.dataset_id
-
-        return text_docs
-
     @staticmethod
     def filter_string(text):
         text = re.sub(r"<\|", "<", text)
@@ -645,10 +667,8 @@ class IndexingRunner:
                 model=dataset.embedding_model,
             )
 
-        # chunk nodes by chunk size
         indexing_start_at = time.perf_counter()
         tokens = 0
-        chunk_size = 10
 
         # create keyword index
         create_keyword_thread = threading.Thread(
@@ -657,11 +677,13 @@ class IndexingRunner:
         )
         create_keyword_thread.start()
         if dataset.indexing_technique == "high_quality":
-            with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                futures = []
-                for i in range(0, len(documents), chunk_size):
-                    chunk_documents = documents[i : i + chunk_size]
-                    futures.append(
+            # vector store clients are not thread-safe, each worker reuses its own for all its chunks
+            worker_vectors = threading.local()
+            chunks = self._pack_chunks(documents, self._get_embedding_max_chunks(embedding_model_instance))
+            completed_document_ids: list[str] = []
+            try:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=self.LOAD_MAX_WORKERS) as executor:
+                    futures = [
                         executor.submit(
                             self._process_chunk,
                             current_app._get_current_object(),
@@ -670,11 +692,21 @@ class IndexingRunner:
                             dataset,
                             dataset_document,
                             embedding_model_instance,
+                            worker_vectors,
                         )
-                    )
-
-                for future in futures:
-                    tokens += future.result()
+                        for chunk_documents in chunks
+                    ]
+
+                    for future in concurrent.futures.as_completed(futures):
+                        chunk_tokens, chunk_document_ids = future.result()
+                        tokens += chunk_tokens
+                        completed_document_ids.extend(chunk_document_ids)
+                        if len(completed_document_ids) >= self.SEGMENT_STATUS_UPDATE_BATCH_SIZE:
+                            self._complete_segments(dataset, dataset_document, completed_document_ids)
+                            completed_document_ids = []
+            finally:
+                # segments of the chunks already indexed are completed even if another chunk failed
+                self._complete_segments(dataset, dataset_document, completed_document_ids)
 
         create_keyword_thread.join()
         indexing_end_at = time.perf_counter()
@@ -717,39 +749,82 @@ class IndexingRunner:
                 db.session.commit()
 
     def _process_chunk(
-        self, flask_app, index_processor, chunk_documents, dataset, dataset_document, embedding_model_instance
-    ):
+        self,
+        flask_app,
+        index_processor,
+        chunk_documents,
+        dataset,
+        dataset_document,
+        embedding_model_instance,
+        worker_vectors: threading.local,
+    ) -> tuple[int, list[str]]:
         with flask_app.app_context():
             # check document is paused
             self._check_document_paused_status(dataset_document.id)
 
             tokens = 0
             if embedding_model_instance:
-                tokens += sum(
-                    embedding_model_instance.get_text_embedding_num_tokens([document.page_content])
-                    for document in chunk_documents
+                tokens += embedding_model_instance.get_text_embedding_num_tokens(
+                    [document.page_content for document in chunk_documents]
                 )
 
+            vector = getattr(worker_vectors, "vector", None)
+            if vector is None:
+                vector = worker_vectors.vector = Vector(dataset)
+
             # load index
-            index_processor.load(dataset, chunk_documents, with_keywords=False)
-
-            document_ids = [document.metadata["doc_id"] for document in chunk_documents]
-            db.session.query(DocumentSegment).filter(
-                DocumentSegment.document_id == dataset_document.id,
-                DocumentSegment.dataset_id == dataset.id,
-                DocumentSegment.index_node_id.in_(document_ids),
-                DocumentSegment.status == "indexing",
-            ).update(
-                {
-                    DocumentSegment.status: "completed",
-                    DocumentSegment.enabled: True,
-                    DocumentSegment.completed_at: datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
-                }
-            )
+            index_processor.load(dataset, chunk_documents, with_keywords=False, vector=vector)
 
-            db.session.commit()
+            return tokens, [document.metadata["doc_id"] for document in chunk_documents]
+
+    @classmethod
+    def _pack_chunks(cls, documents: list[Document], max_chunks: int) -> list[list[Document]]:
+        """
+        Pack documents into the chunks indexed by the load workers.
+        A chunk has at least `LOAD_MIN_CHUNK_SIZE` documents, and is small enough that every worker gets
+        `LOAD_CHUNKS_PER_WORKER` chunks of a large document. When the embedding requests of `max_chunks` texts
+        are smaller than a chunk, a chunk is a whole number of them, so it does not end with a partial request.
+        """
+        chunk_size = max(
+            cls.LOAD_MIN_CHUNK_SIZE, -(-len(documents) // (cls.LOAD_MAX_WORKERS * cls.LOAD_CHUNKS_PER_WORKER))
+        )
+        if max_chunks <= chunk_size:
+            chunk_size = max_chunks * -(-chunk_size // max_chunks)
+        return [documents[i : i + chunk_size] for i in range(0, len(documents), chunk_size)]
+
+    @staticmethod
+    def _get_embedding_max_chunks(embedding_model_instance: Optional[ModelInstance]) -> int:
+        if not embedding_model_instance:
+            return 1
+        model_type_instance = cast(TextEmbeddingModel, embedding_model_instance.model_type_instance)
+        model_schema = model_type_instance.get_model_schema(
+            embedding_model_instance.model, embedding_model_instance.credentials
+        )
+        if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties:
+            return max(int(model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS]), 1)
+        return 1
 
-            return tokens
+    @staticmethod
+    def _complete_segments(dataset: Dataset, dataset_document: DatasetDocument, document_ids: list[str]) -> None:
+        """
+        Mark the indexed segments as completed, in one update per batch of chunks.
+        """
+        if not document_ids:
+            return
+        db.session.query(DocumentSegment).filter(
+            DocumentSegment.document_id == dataset_document.id,
+            DocumentSegment.dataset_id == dataset.id,
+            DocumentSegment.index_node_id.in_(document_ids),
+            DocumentSegment.status == "indexing",
+        ).update(
+            {
+                DocumentSegment.status: "completed",
+                DocumentSegment.enabled: True,
+                DocumentSegment.completed_at: datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+            },
+            synchronize_session=False,
+        )
+        db.session.commit()
 
     @staticmethod
     def _check_document_paused_status(document_id: str):
@@ -814,7 +889,7 @@ class IndexingRunner:
         self,
         index_processor: BaseIndexProcessor,
         dataset: Dataset,
-        text_docs: list[Document],
+        text_docs: Iterable[Document],
         doc_language: str,
         process_rule: dict,
     ) -> list[Document]:
@@ -0,0 +1,62 @@
+import logging
+from typing import Optional
+
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# process-local cache of the token counts of history prompt messages, in front of redis
+message_tokens_cache = LRUCache(capacity=dify_config.MESSAGE_TOKENS_CACHE_MAX_SIZE)
+
+
+class MessageTokensCache:
+    """
+    Token counts of the prompt messages of stored messages, per model.
+    The count of a message never changes for a model, so counts are cached in process memory and in Redis,
+    shared by all the workers serving the conversation.
+    """
+
+    def __init__(self, provider: str, model: str) -> None:
+        self.provider = provider
+        self.model = model
+
+    def get_cache_key(self, message_id: str, role: str) -> str:
+        return f"message_tokens:{self.provider}:{self.model}:{message_id}:{role}"
+
+    def get_many(self, cache_keys: list[str]) -> list[Optional[int]]:
+        """
+        Get cached token counts, process memory first and then Redis in one round trip.
+        """
+        message_tokens: list[Optional[int]] = [message_tokens_cache.get(cache_key) for cache_key in cache_keys]
+        missing_indexes = [i for i, tokens in enumerate(message_tokens) if tokens is None]
+        if not missing_indexes or dify_config.MESSAGE_TOKENS_CACHE_TTL <= 0:
+            return message_tokens
+
+        try:
+            values = redis_client.mget([cache_keys[i] for i in missing_indexes])
+        except Exception:
+            logger.exception("Failed to get message tokens from redis")
+            return message_tokens
+
+        for i, value in zip(missing_indexes, values):
+            if value is not None:
+                message_tokens[i] = int(value)
+                message_tokens_cache.put(cache_keys[i], message_tokens[i])
+        return message_tokens
+
+    def set_many(self, message_tokens: dict[str, int]) -> None:
+        for cache_key, tokens in message_tokens.items():
+            message_tokens_cache.put(cache_key, tokens)
+
+        if not message_tokens or dify_config.MESSAGE_TOKENS_CACHE_TTL <= 0:
+            return
+
+        try:
+            with redis_client.pipeline(transaction=False) as pipe:
+                for cache_key, tokens in message_tokens.items():
+                    pipe.setex(cache_key, dify_config.MESSAGE_TOKENS_CACHE_TTL, tokens)
+                pipe.execute()
+        except Exception:
+            logger.exception("Failed to set message tokens to redis")
@@ -2,7 +2,8 @@ from typing import Optional
 
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
 from core.file import file_manager
-from core.file.models import FileType
+from core.file.models import FileExtraConfig, FileType
+from core.memory.message_tokens_cache import MessageTokensCache
 from core.model_manager import ModelInstance
 from core.model_runtime.entities import (
     AssistantPromptMessage,
@@ -17,10 +18,18 @@ from core.prompt.utils.extract_thread_messages import extract_thread_messages
 from extensions.ext_database import db
 from factories import file_factory
 from models.model import AppMode, Conversation, Message, MessageFile
-from models.workflow import WorkflowRun
+from models.workflow import Workflow, WorkflowRun
 
 
 class TokenBufferMemory:
+    # minimum number of messages with stored tokens worth counting a sample message to reuse them
+    STORED_TOKENS_MIN_MESSAGES = 2
+    # stored tokens are reused if counting a message differs from them by at most this or 10% of the count
+    STORED_TOKENS_TOLERANCE = 16
+    # bounds of the tokens of an answer for its length, stored tokens out of them do not match the answer
+    STORED_TOKENS_MAX_CHARS_PER_TOKEN = 16
+    STORED_TOKENS_MAX_TOKENS_PER_CHAR = 3
+
     def __init__(self, conversation: Conversation, model_instance: ModelInstance) -> None:
         self.conversation = conversation
         self.model_instance = model_instance
@@ -44,6 +53,9 @@ class TokenBufferMemory:
                 Message.created_at,
                 Message.workflow_run_id,
                 Message.parent_message_id,
+                Message.answer_tokens,
+                Message.model_provider,
+                Message.model_id,
             )
             .filter(
                 Message.conversation_id == self.conversation.id,
@@ -68,24 +80,19 @@ class TokenBufferMemory:
 
         messages = list(reversed(thread_messages))
 
+        # load the files of all the messages, and their file upload configs, at once
+        message_files = self._get_message_files([message.id for message in messages])
+        file_extra_configs = self._get_file_extra_configs(
+            [message for message in messages if message.id in message_files]
+        )
+
         prompt_messages = []
+        prompt_message_ids = []
+        prompt_message_stored_tokens = []
         for message in messages:
-            files = db.session.query(MessageFile).filter(MessageFile.message_id == message.id).all()
+            files = message_files.get(message.id)
             if files:
-                file_extra_config = None
-                if self.conversation.mode not in {AppMode.ADVANCED_CHAT, AppMode.WORKFLOW}:
-                    file_extra_config = FileUploadConfigManager.convert(self.conversation.model_config)
-                else:
-                    if message.workflow_run_id:
-                        workflow_run = (
-                            db.session.query(WorkflowRun).filter(WorkflowRun.id == message.workflow_run_id).first()
-                        )
-
-                        if workflow_run:
-                            file_extra_config = FileUploadConfigManager.convert(
-                                workflow_run.workflow.features_dict, is_vision=False
-                            )
-
+                file_extra_config = file_extra_configs.get(message.id)
                 if file_extra_config and app_record:
                     file_objs = file_factory.build_from_message_files(
                         message_files=files, tenant_id=app_record.tenant_id, config=file_extra_config
@@ -108,20 +115,174 @@ class TokenBufferMemory:
                 prompt_messages.append(UserPromptMessage(content=message.query))
 
             prompt_messages.append(AssistantPromptMessage(content=message.answer))
+            prompt_message_ids.extend([message.id, message.id])
+            prompt_message_stored_tokens.extend([None, self._get_stored_answer_tokens(message)])
 
         if not prompt_messages:
             return []
 
         # prune the chat message if it exceeds the max token limit
+        return self._prune_prompt_messages(
+            prompt_messages, prompt_message_ids, max_token_limit, prompt_message_stored_tokens
+        )
+
+    @staticmethod
+    def _get_message_files(message_ids: list[str]) -> dict[str, list[MessageFile]]:
+        """
+        Get the files of messages in one query.
+        :param message_ids: message ids
+        :return: files by message id
+        """
+        if not message_ids:
+            return {}
+
+        message_files: dict[str, list[MessageFile]] = {}
+        files = db.session.query(MessageFile).filter(MessageFile.message_id.in_(message_ids)).all()
+        for file in files:
+            message_files.setdefault(file.message_id, []).append(file)
+        return message_files
+
+    def _get_file_extra_configs(self, messages: list) -> dict[str, Optional[FileExtraConfig]]:
+        """
+        Get the file upload configs of messages, resolved once per app model config or workflow.
+        :param messages: messages with files
+        :return: file upload configs by message id
+        """
+        if not messages:
+            return {}
+
+        if self.conversation.mode not in {AppMode.ADVANCED_CHAT, AppMode.WORKFLOW}:
+            file_extra_config = FileUploadConfigManager.convert(self.conversation.model_config)
+            return {message.id: file_extra_config for message in messages}
+
+        workflow_run_ids = {message.workflow_run_id for message in messages if message.workflow_run_id}
+        if not workflow_run_ids:
+            return {}
+
+        workflow_ids = dict(
+            db.session.query(WorkflowRun.id, WorkflowRun.workflow_id).filter(WorkflowRun.id.in_(workflow_run_ids)).all()
+        )
+        workflows = db.session.query(Workflow).filter(Workflow.id.in_(set(workflow_ids.values()))).all()
+        workflow_file_extra_configs = {
+            workflow.id: FileUploadConfigManager.convert(workflow.features_dict, is_vision=False)
+            for workflow in workflows
+        }
+
+        return {
+            message.id: workflow_file_extra_configs.get(workflow_ids.get(message.workflow_run_id))
+            for message in messages
+            if message.workflow_run_id
+        }
+
+    def _get_stored_answer_tokens(self, message: Message) -> Optional[int]:
+        """
+        Get the completion tokens stored with a message if they were counted by the current model.
+        Only chat apps store the tokens of the answer alone, agent and workflow apps store the sum of several calls.
+        The answer may also differ from the completion (e.g. replaced by moderation, or a stopped generation),
+        so the tokens are only reused if they are plausible for the length of the answer.
+        """
+        if not (
+            self.conversation.mode == AppMode.CHAT
+            and message.answer_tokens
+            and message.model_provider == self.model_instance.provider
+            and message.model_id == self.model_instance.model
+        ):
+            return None
+
+        answer_length = len(message.answer)
+        if not (
+            answer_length / self.STORED_TOKENS_MAX_CHARS_PER_TOKEN
+            <= message.answer_tokens
+            <= answer_length * self.STORED_TOKENS_MAX_TOKENS_PER_CHAR
+        ):
+            return None
+        return message.answer_tokens
+
+    def _prune_prompt_messages(
+        self,
+        prompt_messages: list[PromptMessage],
+        message_ids: list[str],
+        max_token_limit: int,
+        stored_tokens: Optional[list[Optional[int]]] = None,
+    ) -> list[PromptMessage]:
+        """
+        Drop the oldest prompt messages until the rest fits in max token limit, keeping at least the last one.
+        Each message is counted once (cached per model and message) and the cut is found with suffix sums.
+        :param prompt_messages: prompt messages, oldest first
+        :param message_ids: id of the message each prompt message comes from
+        :param max_token_limit: max token limit
+        :param stored_tokens: tokens stored with the message of each prompt message, if any
+        """
         curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+        if curr_message_tokens <= max_token_limit:
+            return prompt_messages
+
+        message_tokens = self._get_messages_tokens(
+            prompt_messages, message_ids, stored_tokens or [None] * len(prompt_messages)
+        )
 
-        if curr_message_tokens > max_token_limit:
-            pruned_memory = []
-            while curr_message_tokens > max_token_limit and len(prompt_messages) > 1:
-                pruned_memory.append(prompt_messages.pop(0))
-                curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+        # counting messages one by one also counts the fixed tokens of a request (e.g. reply priming) once per
+        # message, estimate them so that the sums match counting the messages together
+        overhead = 0.0
+        if len(message_tokens) > 1:
+            overhead = max((sum(message_tokens) - curr_message_tokens) / (len(message_tokens) - 1), 0.0)
+
+        start = len(prompt_messages) - 1
+        suffix_tokens = 0
+        for index in range(len(prompt_messages) - 1, -1, -1):
+            suffix_tokens += message_tokens[index]
+            if suffix_tokens - (len(prompt_messages) - 1 - index) * overhead > max_token_limit:
+                break
+            start = index
+
+        return prompt_messages[start:]
+
+    def _get_messages_tokens(
+        self, prompt_messages: list[PromptMessage], message_ids: list[str], stored_tokens: list[Optional[int]]
+    ) -> list[int]:
+        """
+        Get the token count of each prompt message, from the cache, estimated from the tokens stored with the message
+        or by counting it, and cache the new counts.
+        Only counts are cached, estimates are cheap to get again and must not be shared as counts.
+        """
+        cache = MessageTokensCache(self.model_instance.provider, self.model_instance.model)
+        cache_keys = [
+            cache.get_cache_key(message_id, prompt_message.role.value)
+            for prompt_message, message_id in zip(prompt_messages, message_ids)
+        ]
+        message_tokens = cache.get_many(cache_keys)
+        missing_indexes = [i for i, tokens in enumerate(message_tokens) if tokens is None]
+        if not missing_indexes:
+            return message_tokens
+
+        new_message_tokens = {}
+        stored_indexes = [i for i in missing_indexes if stored_tokens[i]]
+        # stored tokens count the content only, compare them with the count of one of the messages to get the tokens
+        # wrapping a message and to check the stored tokens match the tokenizer of the model
+        sample_index = next(
+            (i for i, tokens in enumerate(stored_tokens) if tokens and message_tokens[i] is not None), None
+        )
+        wrapper_tokens = None
+        if stored_indexes and (sample_index is not None or len(stored_indexes) >= self.STORED_TOKENS_MIN_MESSAGES):
+            if sample_index is None:
+                sample_index = stored_indexes[0]
+                message_tokens[sample_index] = self.model_instance.get_llm_num_tokens([prompt_messages[sample_index]])
+                new_message_tokens[cache_keys[sample_index]] = message_tokens[sample_index]
+            wrapper_tokens = message_tokens[sample_index] - stored_tokens[sample_index]
+            if abs(wrapper_tokens) > max(self.STORED_TOKENS_TOLERANCE, message_tokens[sample_index] // 10):
+                wrapper_tokens = None
+
+        for i in missing_indexes:
+            if message_tokens[i] is not None:
+                continue
+            if wrapper_tokens is not None and stored_tokens[i]:
+                message_tokens[i] = stored_tokens[i] + wrapper_tokens
+            else:
+                message_tokens[i] = self.model_instance.get_llm_num_tokens([prompt_messages[i]])
+                new_message_tokens[cache_keys[i]] = message_tokens[i]
 
-        return prompt_messages
+        cache.set_many(new_message_tokens)
+        return message_tokens
 
     def get_history_prompt_text(
         self,
@@ -1,12 +1,47 @@
+import json
+from collections.abc import Sequence
 from os.path import abspath, dirname, join
 from threading import Lock
 from typing import Any
 
-from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer
+import tiktoken
 
 _tokenizer = None
 _lock = Lock()
 
+# pre-tokenization pattern and special token of the gpt2 encoding
+_GPT2_PAT_STR = r"""'(?:[sdmt]|ll|ve|re)| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+"""
+_GPT2_END_OF_TEXT = "<|endoftext|>"
+
+
+def _load_gpt2_encoding() -> tiktoken.Encoding:
+    """
+    Build the tiktoken gpt2 encoding from the bundled vocab, without any network access.
+    The vocab maps bytes to ids through printable unicode characters, and the gpt2 merge ranks are the ids.
+    """
+    printable_bytes = [b for b in range(2**8) if chr(b).isprintable() and chr(b) != " "]
+    byte_decoder = {chr(b): b for b in printable_bytes}
+    n = 0
+    for b in range(2**8):
+        if b not in printable_bytes:
+            byte_decoder[chr(2**8 + n)] = b
+            n += 1
+
+    vocab_path = join(dirname(abspath(__file__)), "gpt2", "vocab.json")
+    with open(vocab_path, encoding="utf-8") as f:
+        vocab: dict[str, int] = json.load(f)
+
+    mergeable_ranks = {
+        bytes(byte_decoder[c] for c in token): rank for token, rank in vocab.items() if token != _GPT2_END_OF_TEXT
+    }
+    return tiktoken.Encoding(
+        name="gpt2",
+        explicit_n_vocab=len(vocab),
+        pat_str=_GPT2_PAT_STR,
+        mergeable_ranks=mergeable_ranks,
+        special_tokens={_GPT2_END_OF_TEXT: vocab[_GPT2_END_OF_TEXT]},
+    )
+
 
 class GPT2Tokenizer:
     @staticmethod
@@ -15,20 +50,28 @@ class GPT2Tokenizer:
         use gpt2 tokenizer to get num tokens
         """
         _tokenizer = GPT2Tokenizer.get_encoder()
-        tokens = _tokenizer.encode(text, verbose=False)
+        tokens = _tokenizer.encode(text, allowed_special="all")
         return len(tokens)
 
     @staticmethod
     def get_num_tokens(text: str) -> int:
         return GPT2Tokenizer._get_num_tokens_by_gpt2(text)
 
+    @staticmethod
+    def get_num_tokens_batch(texts: Sequence[str]) -> list[int]:
+        """
+        use gpt2 tokenizer to get num tokens of each text, encoding the texts in parallel
+        """
+        _tokenizer = GPT2Tokenizer.get_encoder()
+        return [len(tokens) for tokens in _tokenizer.encode_batch(list(texts), allowed_special="all")]
+
     @staticmethod
     def get_encoder() -> Any:
-        global _tokenizer, _lock
-        with _lock:
-            if _tokenizer is None:
-                base_path = abspath(__file__)
-                gpt2_tokenizer_path = join(dirname(base_path), "gpt2")
-                _tokenizer = TransformerGPT2Tokenizer.from_pretrained(gpt2_tokenizer_path)
-
-            return _tokenizer
+        global _tokenizer
+        # the encoder is immutable and thread-safe, only its initialization takes the lock
+        if _tokenizer is None:
+            with _lock:
+                if _tokenizer is None:
+                    _tokenizer = _load_gpt2_encoding()
+
+        return _tokenizer
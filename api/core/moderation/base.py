@@ -75,6 +75,18 @@ class Moderation(Extensible, ABC):
         """
         raise NotImplementedError
 
+    def moderation_for_appended_outputs(self, text: str, checked_length: int) -> ModerationOutputsResult:
+        """
+        Moderation for streamed outputs.
+        Called as the LLM output grows, the first `checked_length` characters of the text passed moderation before.
+        Moderations that can review the appended content alone override this, by default the whole text is reviewed.
+
+        :param text: LLM output content so far
+        :param checked_length: length of the text that passed moderation before
+        :return:
+        """
+        return self.moderation_for_outputs(text)
+
     @classmethod
     def _validate_inputs_and_outputs_config(cls, config: dict, is_preset_response_required: bool) -> None:
         # inputs_config
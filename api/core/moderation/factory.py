@@ -46,3 +46,14 @@ class ModerationFactory:
         :return:
         """
         return self.__extension_instance.moderation_for_outputs(text)
+
+    def moderation_for_appended_outputs(self, text: str, checked_length: int) -> ModerationOutputsResult:
+        """
+        Moderation for streamed outputs.
+        Called as the LLM output grows, the first `checked_length` characters of the text passed moderation before.
+
+        :param text: LLM output content so far
+        :param checked_length: length of the text that passed moderation before
+        :return:
+        """
+        return self.__extension_instance.moderation_for_appended_outputs(text, checked_length)
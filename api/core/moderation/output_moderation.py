@@ -1,10 +1,11 @@
 import logging
+import os
 import threading
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
 from flask import Flask, current_app
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from configs import dify_config
 from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
@@ -14,6 +15,32 @@ from core.moderation.factory import ModerationFactory
 
 logger = logging.getLogger(__name__)
 
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Get the thread pool moderating the streamed outputs of all requests in this process.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=dify_config.MODERATION_MAX_WORKERS, thread_name_prefix="output_moderation"
+                )
+    return _executor
+
+
+def _reset_executor():
+    global _executor
+    _executor = None
+
+
+# worker threads are not inherited by forked worker processes
+os.register_at_fork(after_in_child=_reset_executor)
+
 
 class ModerationRule(BaseModel):
     type: str
@@ -27,13 +54,20 @@ class OutputModeration(BaseModel):
     rule: ModerationRule
     queue_manager: AppQueueManager
 
-    thread: Optional[threading.Thread] = None
     thread_running: bool = True
     buffer: str = ""
     is_final_chunk: bool = False
     final_output: Optional[str] = None
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    # whether a moderation of the buffer is scheduled or running
+    _checking: bool = PrivateAttr(default=False)
+    # length of the buffer at the start of the last moderation
+    _scheduled_length: int = PrivateAttr(default=0)
+    # length of the buffer that passed moderation
+    _checked_length: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
     def should_direct_output(self) -> bool:
         return self.final_output is not None
 
@@ -41,10 +75,19 @@ class OutputModeration(BaseModel):
         return self.final_output or ""
 
     def append_new_token(self, token: str) -> None:
-        self.buffer += token
+        with self._lock:
+            self.buffer += token
 
-        if not self.thread:
-            self.thread = self.start_thread()
+            # moderate once MODERATION_BUFFER_SIZE new characters arrived, at most one moderation at a time
+            if (
+                self._checking
+                or not self.thread_running
+                or len(self.buffer) - self._scheduled_length < dify_config.MODERATION_BUFFER_SIZE
+            ):
+                return
+            self._checking = True
+
+        _get_executor().submit(self.worker, flask_app=current_app._get_current_object())  # type: ignore[attr-defined]
 
     def moderation_completion(self, completion: str, public_event: bool = False) -> str:
         self.buffer = completion
@@ -65,65 +108,64 @@ class OutputModeration(BaseModel):
 
         return final_output
 
-    def start_thread(self) -> threading.Thread:
-        buffer_size = dify_config.MODERATION_BUFFER_SIZE
-        thread = threading.Thread(
-            target=self.worker,
-            kwargs={
-                "flask_app": current_app._get_current_object(),
-                "buffer_size": buffer_size if buffer_size > 0 else dify_config.MODERATION_BUFFER_SIZE,
-            },
-        )
-
-        thread.start()
-
-        return thread
-
     def stop_thread(self):
-        if self.thread and self.thread.is_alive():
-            self.thread_running = False
+        self.thread_running = False
 
-    def worker(self, flask_app: Flask, buffer_size: int):
+    def worker(self, flask_app: Flask):
         with flask_app.app_context():
-            current_length = 0
-            while self.thread_running:
-                moderation_buffer = self.buffer
-                buffer_length = len(moderation_buffer)
-                if not self.is_final_chunk:
-                    chunk_length = buffer_length - current_length
-                    if 0 <= chunk_length < buffer_size:
-                        time.sleep(1)
-                        continue
-
-                current_length = buffer_length
+            while True:
+                with self._lock:
+                    if not self.thread_running:
+                        self._checking = False
+                        return
+                    moderation_buffer = self.buffer
+                    self._scheduled_length = len(moderation_buffer)
 
                 result = self.moderation(
-                    tenant_id=self.tenant_id, app_id=self.app_id, moderation_buffer=moderation_buffer
+                    tenant_id=self.tenant_id,
+                    app_id=self.app_id,
+                    moderation_buffer=moderation_buffer,
+                    checked_length=self._checked_length,
                 )
 
-                if not result or not result.flagged:
-                    continue
-
-                if result.action == ModerationAction.DIRECT_OUTPUT:
-                    final_output = result.preset_response
-                    self.final_output = final_output
-                else:
-                    final_output = result.text + self.buffer[len(moderation_buffer) :]
-
-                # trigger replace event
-                if self.thread_running:
-                    self.queue_manager.publish(QueueMessageReplaceEvent(text=final_output), PublishFrom.TASK_PIPELINE)
-
-                if result.action == ModerationAction.DIRECT_OUTPUT:
-                    break
-
-    def moderation(self, tenant_id: str, app_id: str, moderation_buffer: str) -> Optional[ModerationOutputsResult]:
+                if result and result.flagged:
+                    if result.action == ModerationAction.DIRECT_OUTPUT:
+                        final_output = result.preset_response
+                        self.final_output = final_output
+                    else:
+                        final_output = result.text + self.buffer[len(moderation_buffer) :]
+
+                    # trigger replace event
+                    if self.thread_running:
+                        self.queue_manager.publish(
+                            QueueMessageReplaceEvent(text=final_output), PublishFrom.TASK_PIPELINE
+                        )
+
+                    if result.action == ModerationAction.DIRECT_OUTPUT:
+                        with self._lock:
+                            self.thread_running = False
+                            self._checking = False
+                        return
+                elif result:
+                    self._checked_length = len(moderation_buffer)
+
+                with self._lock:
+                    # moderate again right away if enough new characters arrived meanwhile
+                    if len(self.buffer) - self._scheduled_length < dify_config.MODERATION_BUFFER_SIZE:
+                        self._checking = False
+                        return
+
+    def moderation(
+        self, tenant_id: str, app_id: str, moderation_buffer: str, checked_length: int = 0
+    ) -> Optional[ModerationOutputsResult]:
         try:
             moderation_factory = ModerationFactory(
                 name=self.rule.type, app_id=app_id, tenant_id=tenant_id, config=self.rule.config
             )
 
-            result: ModerationOutputsResult = moderation_factory.moderation_for_outputs(moderation_buffer)
+            result: ModerationOutputsResult = moderation_factory.moderation_for_appended_outputs(
+                moderation_buffer, checked_length
+            )
             return result
         except Exception as e:
             logger.error("Moderation Output error: %s", e)
@@ -1,10 +1,12 @@
 import json
+import uuid
 from collections import defaultdict
 from typing import Any, Optional
 
 from pydantic import BaseModel
 
 from configs import dify_config
+from core.helper.lru_cache import LRUCache
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
 from core.rag.datasource.keyword.keyword_base import BaseKeyword
 from core.rag.models.document import Document
@@ -13,6 +15,12 @@ from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
 from models.dataset import Dataset, DatasetKeywordTable, DocumentSegment
 
+# process-local cache of parsed keyword tables: dataset id -> (version stamp, keyword table)
+keyword_table_cache = LRUCache(capacity=dify_config.KEYWORD_TABLE_CACHE_MAX_SIZE)
+
+# max number of segments loaded per `IN` query when updating segment keywords
+SEGMENT_BATCH_SIZE = 500
+
 
 class KeywordTableConfig(BaseModel):
     max_keywords_per_chunk: int = 10
@@ -28,13 +36,15 @@ class Jieba(BaseKeyword):
         with redis_client.lock(lock_name, timeout=600):
             keyword_table_handler = JiebaKeywordTableHandler()
             keyword_table = self._get_dataset_keyword_table()
+            segment_keywords = {}
             for text in texts:
                 keywords = keyword_table_handler.extract_keywords(
                     text.page_content, self._config.max_keywords_per_chunk
                 )
-                self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+                segment_keywords[text.metadata["doc_id"]] = list(keywords)
                 keyword_table = self._add_text_to_keyword_table(keyword_table, text.metadata["doc_id"], list(keywords))
 
+            self._update_segments_keywords(self.dataset.id, segment_keywords)
             self._save_dataset_keyword_table(keyword_table)
 
             return self
@@ -46,6 +56,7 @@ class Jieba(BaseKeyword):
 
             keyword_table = self._get_dataset_keyword_table()
             keywords_list = kwargs.get("keywords_list")
+            segment_keywords = {}
             for i in range(len(texts)):
                 text = texts[i]
                 if keywords_list:
@@ -58,13 +69,14 @@ class Jieba(BaseKeyword):
                     keywords = keyword_table_handler.extract_keywords(
                         text.page_content, self._config.max_keywords_per_chunk
                     )
-                self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+                segment_keywords[text.metadata["doc_id"]] = list(keywords)
                 keyword_table = self._add_text_to_keyword_table(keyword_table, text.metadata["doc_id"], list(keywords))
 
+            self._update_segments_keywords(self.dataset.id, segment_keywords)
             self._save_dataset_keyword_table(keyword_table)
 
     def text_exists(self, id: str) -> bool:
-        keyword_table = self._get_dataset_keyword_table()
+        keyword_table = self._get_cached_dataset_keyword_table()
         return id in set.union(*keyword_table.values())
 
     def delete_by_ids(self, ids: list[str]) -> None:
@@ -76,20 +88,30 @@ class Jieba(BaseKeyword):
             self._save_dataset_keyword_table(keyword_table)
 
     def search(self, query: str, **kwargs: Any) -> list[Document]:
-        keyword_table = self._get_dataset_keyword_table()
+        keyword_table = self._get_cached_dataset_keyword_table()
 
         k = kwargs.get("top_k", 4)
 
         sorted_chunk_indices = self._retrieve_ids_by_query(keyword_table, query, k)
 
-        documents = []
-        for chunk_index in sorted_chunk_indices:
-            segment = (
-                db.session.query(DocumentSegment)
-                .filter(DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id == chunk_index)
-                .first()
+        return self._get_documents_by_chunk_indices(sorted_chunk_indices)
+
+    def _get_documents_by_chunk_indices(self, sorted_chunk_indices: list[str]) -> list[Document]:
+        if not sorted_chunk_indices:
+            return []
+        segments = (
+            db.session.query(DocumentSegment)
+            .filter(
+                DocumentSegment.dataset_id == self.dataset.id,
+                DocumentSegment.index_node_id.in_(sorted_chunk_indices),
             )
+            .all()
+        )
+        segment_map = {segment.index_node_id: segment for segment in segments}
 
+        documents = []
+        for chunk_index in sorted_chunk_indices:
+            segment = segment_map.get(chunk_index)
             if segment:
                 documents.append(
                     Document(
@@ -115,6 +137,7 @@ class Jieba(BaseKeyword):
                 if dataset_keyword_table.data_source_type != "database":
                     file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
                     storage.delete(file_key)
+                self._bump_keyword_table_version()
 
     def _save_dataset_keyword_table(self, keyword_table):
         keyword_table_dict = {
@@ -131,6 +154,35 @@ class Jieba(BaseKeyword):
             if storage.exists(file_key):
                 storage.delete(file_key)
             storage.save(file_key, json.dumps(keyword_table_dict, cls=SetEncoder).encode("utf-8"))
+        self._bump_keyword_table_version()
+
+    def _get_cached_dataset_keyword_table(self) -> Optional[dict]:
+        """
+        Get the dataset keyword table for read-only use.
+        The parsed table is cached per process and reused until its version stamp in redis changes.
+        The returned table is shared and must not be mutated.
+        """
+        version_key = self._keyword_table_version_key()
+        version = redis_client.get(version_key)
+        if version is None:
+            redis_client.set(version_key, uuid.uuid4().hex, nx=True)
+            version = redis_client.get(version_key)
+        if version is None:
+            return self._get_dataset_keyword_table()
+
+        cached = keyword_table_cache.get(self.dataset.id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        keyword_table = self._get_dataset_keyword_table()
+        keyword_table_cache.put(self.dataset.id, (version, keyword_table))
+        return keyword_table
+
+    def _bump_keyword_table_version(self) -> None:
+        redis_client.set(self._keyword_table_version_key(), uuid.uuid4().hex)
+
+    def _keyword_table_version_key(self) -> str:
+        return "keyword_table_version_{}".format(self.dataset.id)
 
     def _get_dataset_keyword_table(self) -> Optional[dict]:
         dataset_keyword_table = self.dataset.dataset_keyword_table
@@ -212,6 +264,27 @@ class Jieba(BaseKeyword):
             db.session.add(document_segment)
             db.session.commit()
 
+    def _update_segments_keywords(self, dataset_id: str, segment_keywords: dict[str, list[str]]):
+        """
+        Update keywords of many segments with one query and one commit per batch.
+
+        :param dataset_id: dataset id
+        :param segment_keywords: index node id -> keywords
+        """
+        node_ids = list(segment_keywords.keys())
+        for i in range(0, len(node_ids), SEGMENT_BATCH_SIZE):
+            document_segments = (
+                db.session.query(DocumentSegment)
+                .filter(
+                    DocumentSegment.dataset_id == dataset_id,
+                    DocumentSegment.index_node_id.in_(node_ids[i : i + SEGMENT_BATCH_SIZE]),
+                )
+                .all()
+            )
+            for document_segment in document_segments:
+                document_segment.keywords = segment_keywords[document_segment.index_node_id]
+            db.session.commit()
+
     def create_segment_keywords(self, node_id: str, keywords: list[str]):
         keyword_table = self._get_dataset_keyword_table()
         self._update_segment_keywords(self.dataset.id, node_id, keywords)
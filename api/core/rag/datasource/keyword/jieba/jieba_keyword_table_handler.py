@@ -4,7 +4,14 @@ from typing import Optional
 import jieba
 from jieba.analyse import default_tfidf
 
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
 from core.rag.datasource.keyword.jieba.stopwords import STOPWORDS
+from core.rag.models.document import Document
+from libs import helper
+
+# keywords extracted from document contents, keyed by content hash (index_node_hash)
+document_keywords_cache = LRUCache(capacity=dify_config.DOCUMENT_KEYWORDS_CACHE_MAX_SIZE)
 
 
 class JiebaKeywordTableHandler:
@@ -20,6 +27,20 @@ class JiebaKeywordTableHandler:
 
         return set(self._expand_tokens_with_subtokens(keywords))
 
+    def extract_document_keywords(self, document: Document) -> set[str]:
+        """
+        Get keywords of a retrieved document for keyword scoring, all its keywords like for the query.
+        Keywords stored on the segment are not reused, they are limited to `max_keywords_per_chunk`,
+        extraction results are cached by the document's content hash instead.
+        """
+        doc_hash = document.metadata.get("doc_hash") or helper.generate_text_hash(document.page_content)
+        keywords = document_keywords_cache.get(doc_hash)
+        if keywords is None:
+            keywords = self.extract_keywords(document.page_content, None)
+            document_keywords_cache.put(doc_hash, keywords)
+
+        return set(keywords)
+
     def _expand_tokens_with_subtokens(self, tokens: set[str]) -> set[str]:
         """Get subtokens from a list of tokens., filtering for stopwords."""
         results = set()
@@ -27,6 +48,6 @@ class JiebaKeywordTableHandler:
             results.add(token)
             sub_tokens = re.findall(r"\w+", token)
             if len(sub_tokens) > 1:
-                results.update({w for w in sub_tokens if w not in list(STOPWORDS)})
+                results.update({w for w in sub_tokens if w not in STOPWORDS})
 
         return results
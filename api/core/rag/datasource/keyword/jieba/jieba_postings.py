@@ -0,0 +1,135 @@
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from core.rag.datasource.keyword.jieba.jieba import Jieba
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_base import BaseKeyword
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from models.dataset import DatasetKeywordPosting
+
+# max rows per bulk insert / ids per `IN` clause against the postings table
+POSTINGS_BATCH_SIZE = 1000
+
+
+class JiebaPostings(Jieba):
+    """
+    Jieba keyword store keeping one posting row per (keyword, segment) pair
+    instead of a single serialized keyword table per dataset.
+    Searches only touch the query's keywords and incremental adds/deletes never rewrite the whole index.
+    """
+
+    def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
+        self.add_texts(texts, **kwargs)
+        return self
+
+    def add_texts(self, texts: list[Document], **kwargs):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_list = kwargs.get("keywords_list")
+        postings = {}
+        for i, text in enumerate(texts):
+            keywords = keywords_list[i] if keywords_list else None
+            if not keywords:
+                keywords = keyword_table_handler.extract_keywords(
+                    text.page_content, self._config.max_keywords_per_chunk
+                )
+            postings[text.metadata["doc_id"]] = list(keywords)
+
+        self._update_segments_keywords(self.dataset.id, postings)
+        self._add_postings(postings)
+
+    def text_exists(self, id: str) -> bool:
+        posting = (
+            db.session.query(DatasetKeywordPosting.id)
+            .filter(DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.index_node_id == id)
+            .first()
+        )
+        return posting is not None
+
+    def delete_by_ids(self, ids: list[str]) -> None:
+        self._delete_postings(ids)
+        db.session.commit()
+
+    def search(self, query: str, **kwargs: Any) -> list[Document]:
+        k = kwargs.get("top_k", 4)
+
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords = list(keyword_table_handler.extract_keywords(query))
+        if not keywords:
+            return []
+
+        # go through text chunks in order of most matching keywords
+        match_count = func.count(DatasetKeywordPosting.keyword)
+        rows = (
+            db.session.query(DatasetKeywordPosting.index_node_id, match_count)
+            .filter(DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.keyword.in_(keywords))
+            .group_by(DatasetKeywordPosting.index_node_id)
+            .order_by(match_count.desc(), DatasetKeywordPosting.index_node_id)
+            .limit(k)
+            .all()
+        )
+        sorted_chunk_indices = [row.index_node_id for row in rows]
+
+        return self._get_documents_by_chunk_indices(sorted_chunk_indices)
+
+    def delete(self) -> None:
+        db.session.query(DatasetKeywordPosting).filter(DatasetKeywordPosting.dataset_id == self.dataset.id).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    def create_segment_keywords(self, node_id: str, keywords: list[str]):
+        self._update_segment_keywords(self.dataset.id, node_id, keywords)
+        self._add_postings({node_id: keywords})
+
+    def multi_create_segment_keywords(self, pre_segment_data_list: list):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        postings = {}
+        for pre_segment_data in pre_segment_data_list:
+            segment = pre_segment_data["segment"]
+            if pre_segment_data["keywords"]:
+                keywords = pre_segment_data["keywords"]
+            else:
+                keywords = keyword_table_handler.extract_keywords(segment.content, self._config.max_keywords_per_chunk)
+            segment.keywords = list(keywords)
+            postings[segment.index_node_id] = list(keywords)
+        self._add_postings(postings)
+
+    def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
+        # the new keywords replace the old ones, both changes are committed together
+        self._delete_postings([node_id])
+        self._add_postings({node_id: keywords})
+
+    def add_keyword_table(self, keyword_table: dict[str, set[str]]) -> None:
+        """
+        Load an existing serialized keyword table (keyword -> node ids) into postings.
+        """
+        postings: dict[str, list[str]] = {}
+        for keyword, node_ids in keyword_table.items():
+            for node_id in node_ids:
+                postings.setdefault(node_id, []).append(keyword)
+        self._add_postings(postings)
+
+    def _delete_postings(self, ids: list[str]) -> None:
+        for i in range(0, len(ids), POSTINGS_BATCH_SIZE):
+            db.session.query(DatasetKeywordPosting).filter(
+                DatasetKeywordPosting.dataset_id == self.dataset.id,
+                DatasetKeywordPosting.index_node_id.in_(ids[i : i + POSTINGS_BATCH_SIZE]),
+            ).delete(synchronize_session=False)
+
+    def _add_postings(self, postings: dict[str, list[str]]) -> None:
+        rows = [
+            {"dataset_id": self.dataset.id, "keyword": keyword, "index_node_id": node_id}
+            for node_id, keywords in postings.items()
+            for keyword in set(keywords)
+        ]
+        for i in range(0, len(rows), POSTINGS_BATCH_SIZE):
+            stmt = (
+                insert(DatasetKeywordPosting)
+                .values(rows[i : i + POSTINGS_BATCH_SIZE])
+                .on_conflict_do_nothing(index_elements=["dataset_id", "keyword", "index_node_id"])
+            )
+            db.session.execute(stmt)
+        db.session.commit()
@@ -3,3 +3,4 @@ from enum import Enum
 
 class KeyWordType(str, Enum):
     JIEBA = "jieba"
+    JIEBA_POSTINGS = "jieba_postings"
@@ -3,10 +3,12 @@ import logging
 from typing import Optional, cast
 
 import numpy as np
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
 from configs import dify_config
 from core.entities.embedding_type import EmbeddingInputType
+from core.helper.lru_cache import LRUCache
 from core.model_manager import ModelInstance
 from core.model_runtime.entities.model_entities import ModelPropertyKey
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
@@ -18,6 +20,14 @@ from models.dataset import Embedding
 
 logger = logging.getLogger(__name__)
 
+# max number of hashes per `IN` lookup / rows per bulk insert against the embeddings table
+EMBEDDING_CACHE_QUERY_BATCH_SIZE = 500
+
+# process-local L1 cache of query embeddings in front of redis, keyed like the redis cache
+query_embedding_cache = LRUCache(
+    capacity=dify_config.QUERY_EMBEDDING_CACHE_MAX_SIZE, ttl=dify_config.QUERY_EMBEDDING_CACHE_TTL
+)
+
 
 class CacheEmbedding(Embeddings):
     def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
@@ -28,18 +38,12 @@ class CacheEmbedding(Embeddings):
         """Embed search docs in batches of 10."""
         # use doc embedding cache or store if not exists
         text_embeddings = [None for _ in range(len(texts))]
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = self._load_cached_embeddings(set(text_hashes))
         embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = (
-                db.session.query(Embedding)
-                .filter_by(
-                    model_name=self._model_instance.model, hash=hash, provider_name=self._model_instance.provider
-                )
-                .first()
-            )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
+        for i, hash in enumerate(text_hashes):
+            if hash in cached_embeddings:
+                text_embeddings[i] = cached_embeddings[hash]
             else:
                 embedding_queue_indices.append(i)
         if embedding_queue_indices:
@@ -70,23 +74,13 @@ class CacheEmbedding(Embeddings):
                             db.session.rollback()
                         except Exception as e:
                             logging.exception("Failed transform embedding: %s", e)
-                cache_embeddings = []
-                try:
-                    for i, embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
-                        text_embeddings[i] = embedding
-                        hash = helper.generate_text_hash(texts[i])
-                        if hash not in cache_embeddings:
-                            embedding_cache = Embedding(
-                                model_name=self._model_instance.model,
-                                hash=hash,
-                                provider_name=self._model_instance.provider,
-                            )
-                            embedding_cache.set_embedding(embedding)
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(hash)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
+                cache_embeddings = {}
+                for i, embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
+                    text_embeddings[i] = embedding
+                    hash = text_hashes[i]
+                    if hash not in cache_embeddings:
+                        cache_embeddings[hash] = embedding
+                self._store_cached_embeddings(cache_embeddings)
             except Exception as ex:
                 db.session.rollback()
                 logger.error("Failed to embed documents: %s", ex)
@@ -94,15 +88,77 @@ class CacheEmbedding(Embeddings):
 
         return text_embeddings
 
+    def _load_cached_embeddings(self, hashes: set[str]) -> dict[str, list[float]]:
+        """
+        Fetch cached document embeddings for the given text hashes.
+        Lookups are chunked into `IN` queries served by the `embedding_hash_idx` unique index.
+        """
+        cached_embeddings = {}
+        hash_list = list(hashes)
+        for i in range(0, len(hash_list), EMBEDDING_CACHE_QUERY_BATCH_SIZE):
+            batch_hashes = hash_list[i : i + EMBEDDING_CACHE_QUERY_BATCH_SIZE]
+            embeddings = (
+                db.session.query(Embedding)
+                .filter(
+                    Embedding.model_name == self._model_instance.model,
+                    Embedding.provider_name == self._model_instance.provider,
+                    Embedding.hash.in_(batch_hashes),
+                )
+                .all()
+            )
+            for embedding in embeddings:
+                cached_embeddings[embedding.hash] = embedding.get_embedding()
+        return cached_embeddings
+
+    def _store_cached_embeddings(self, embeddings: dict[str, list[float]]) -> None:
+        """
+        Bulk insert new document embeddings into the cache table.
+        Rows written concurrently by another worker are skipped instead of failing the batch.
+        """
+        if not embeddings:
+            return
+        rows = []
+        for hash, embedding in embeddings.items():
+            embedding_cache = Embedding(
+                model_name=self._model_instance.model,
+                hash=hash,
+                provider_name=self._model_instance.provider,
+            )
+            embedding_cache.set_embedding(embedding)
+            rows.append(
+                {
+                    "model_name": embedding_cache.model_name,
+                    "hash": embedding_cache.hash,
+                    "provider_name": embedding_cache.provider_name,
+                    "embedding": embedding_cache.embedding,
+                }
+            )
+        try:
+            for i in range(0, len(rows), EMBEDDING_CACHE_QUERY_BATCH_SIZE):
+                stmt = (
+                    insert(Embedding)
+                    .values(rows[i : i + EMBEDDING_CACHE_QUERY_BATCH_SIZE])
+                    .on_conflict_do_nothing(index_elements=["model_name", "hash", "provider_name"])
+                )
+                db.session.execute(stmt)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
     def embed_query(self, text: str) -> list[float]:
         """Embed query text."""
         # use doc embedding cache or store if not exists
         hash = helper.generate_text_hash(text)
         embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model}_{hash}"
+        local_embedding = query_embedding_cache.get(embedding_cache_key)
+        if local_embedding is not None:
+            return local_embedding.tolist()
         embedding = redis_client.get(embedding_cache_key)
         if embedding:
             redis_client.expire(embedding_cache_key, 600)
-            return list(np.frombuffer(base64.b64decode(embedding), dtype="float"))
+            embedding_vector = np.frombuffer(base64.b64decode(embedding), dtype="float")
+            query_embedding_cache.put(embedding_cache_key, embedding_vector)
+            return embedding_vector.tolist()
         try:
             embedding_result = self._model_instance.invoke_text_embedding(
                 texts=[text], user=self._user, input_type=EmbeddingInputType.QUERY
@@ -124,6 +180,7 @@ class CacheEmbedding(Embeddings):
             # Transform to string
             encoded_str = encoded_vector.decode("utf-8")
             redis_client.setex(embedding_cache_key, 600, encoded_str)
+            query_embedding_cache.put(embedding_cache_key, embedding_vector)
         except Exception as ex:
             if dify_config.DEBUG:
                 logging.exception("Failed to add embedding to redis %s", ex)
@@ -0,0 +1,118 @@
+import logging
+from pathlib import Path
+from typing import Optional
+
+from pydantic import TypeAdapter
+
+from configs import dify_config
+from core.rag.models.document import Document
+from extensions.ext_storage import storage
+from models.model import UploadFile
+
+logger = logging.getLogger(__name__)
+
+_documents_adapter = TypeAdapter(list[Document])
+
+
+class ExtractCache:
+    """
+    Storage-backed cache of extracted documents of uploaded files, keyed by the hash of the file content,
+    so the same upload is parsed once across estimate, indexing, re-indexing and workflow runs.
+    Only slow extractions of large enough files are cached, others are parsed faster than the cache is read.
+    """
+
+    # bump when the extractors or the serialized format change, older entries are then ignored
+    FORMAT_VERSION = 1
+    KEY_PREFIX = "extract_cache"
+    # ETL types an upload may have been extracted with, see `ETL_TYPE`
+    ETL_TYPES = ("dify", "unstructured")
+    # file extensions whose extraction is slow enough to cache
+    CACHEABLE_FILE_EXTENSIONS = frozenset({".pdf", ".doc", ".docx", ".ppt", ".pptx", ".epub", ".eml", ".msg"})
+
+    @classmethod
+    def should_cache(cls, file_extension: str, file_size: int, uses_unstructured_api: bool = False) -> bool:
+        """
+        :param file_extension: extension of the file, with the leading dot
+        :param file_size: size of the file in bytes
+        :param uses_unstructured_api: the file is extracted by the Unstructured API
+        """
+        if not dify_config.EXTRACT_CACHE_ENABLED or file_size < dify_config.EXTRACT_CACHE_MIN_FILE_SIZE:
+            return False
+        return uses_unstructured_api or file_extension.lower() in cls.CACHEABLE_FILE_EXTENSIONS
+
+    @staticmethod
+    def fits(content_length: int) -> bool:
+        """
+        Check the extracted text is small enough to be held in memory until it is cached.
+        :param content_length: total length in characters of the extracted documents so far
+        """
+        return content_length <= dify_config.EXTRACT_CACHE_MAX_CONTENT_LENGTH
+
+    @staticmethod
+    def get_extractor_key(etl_type: str, is_automatic: bool, file_extension: str) -> str:
+        """
+        Identify the extractor chosen for a file by the extract processor,
+        so the cache is not shared between extractors.
+        """
+        mode = "automatic" if is_automatic else "custom"
+        return f"{etl_type.lower()}-{mode}-{file_extension.lower().lstrip('.')}"
+
+    @staticmethod
+    def get_document_extractor_key(file_extension: str) -> str:
+        """
+        Identify the extractor of the document extractor node for a file.
+        """
+        return f"document-extractor-{file_extension.lower().lstrip('.')}"
+
+    @classmethod
+    def get_key(cls, tenant_id: str, content_hash: str, extractor_key: str) -> str:
+        """
+        :param tenant_id: tenant id, extractors may store tenant-owned files (e.g. docx images)
+        :param content_hash: hash of the file content, the same as the `hash` column of uploaded files
+        :param extractor_key: identifies the extractor and its settings
+        """
+        return f"{cls.KEY_PREFIX}/v{cls.FORMAT_VERSION}/{tenant_id}/{content_hash}/{extractor_key}.json"
+
+    @classmethod
+    def load(cls, key: str) -> Optional[list[Document]]:
+        try:
+            if not storage.exists(key):
+                return None
+            return _documents_adapter.validate_json(storage.load_once(key))
+        except ValueError:
+            logger.warning(f"Ignoring invalid extract cache entry {key}")
+            return None
+        except Exception:
+            logger.exception(f"Failed to load extract cache entry {key}")
+            return None
+
+    @classmethod
+    def save(cls, key: str, documents: list[Document]) -> None:
+        try:
+            storage.save(key, _documents_adapter.dump_json(documents, exclude={"__all__": {"vector"}}))
+        except Exception:
+            logger.exception(f"Failed to save extract cache entry {key}")
+
+    @classmethod
+    def delete_upload_file_entries(cls, upload_file: UploadFile) -> None:
+        """
+        Delete the entries of every extractor of an uploaded file, called when the file is deleted.
+        """
+        if not upload_file.hash:
+            return
+
+        file_extension = Path(upload_file.key).suffix
+        extractor_keys = [
+            cls.get_extractor_key(etl_type, is_automatic, file_extension)
+            for etl_type in cls.ETL_TYPES
+            for is_automatic in (True, False)
+        ]
+        extractor_keys.append(cls.get_document_extractor_key(file_extension))
+
+        for extractor_key in extractor_keys:
+            key = cls.get_key(upload_file.tenant_id, upload_file.hash, extractor_key)
+            try:
+                if storage.exists(key):
+                    storage.delete(key)
+            except Exception:
+                logger.exception(f"Failed to delete extract cache entry {key}")
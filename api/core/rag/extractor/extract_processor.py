@@ -1,5 +1,6 @@
 import re
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Optional, Union
 from urllib.parse import unquote
@@ -10,6 +11,7 @@ from core.rag.extractor.csv_extractor import CSVExtractor
 from core.rag.extractor.entity.datasource_type import DatasourceType
 from core.rag.extractor.entity.extract_setting import ExtractSetting
 from core.rag.extractor.excel_extractor import ExcelExtractor
+from core.rag.extractor.extract_cache import ExtractCache
 from core.rag.extractor.firecrawl.firecrawl_web_extractor import FirecrawlWebExtractor
 from core.rag.extractor.html_extractor import HtmlExtractor
 from core.rag.extractor.jina_reader_extractor import JinaReaderWebExtractor
@@ -30,6 +32,8 @@ from core.rag.models.document import Document
 from extensions.ext_storage import storage
 from models.model import UploadFile
 
+# file extensions always extracted locally, also when the ETL type is Unstructured
+LOCAL_EXTRACTOR_FILE_EXTENSIONS = frozenset({".xlsx", ".xls", ".pdf", ".htm", ".html", ".docx", ".csv"})
 SUPPORT_URL_CONTENT_TYPES = ["application/pdf", "text/plain", "application/json"]
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124"
@@ -86,11 +90,31 @@ class ExtractProcessor:
     def extract(
         cls, extract_setting: ExtractSetting, is_automatic: bool = False, file_path: Optional[str] = None
     ) -> list[Document]:
+        return list(cls.extract_iter(extract_setting, is_automatic, file_path))
+
+    @classmethod
+    def extract_iter(
+        cls, extract_setting: ExtractSetting, is_automatic: bool = False, file_path: Optional[str] = None
+    ) -> Iterator[Document]:
+        """
+        Lazily extract documents, yielding them as the extractor produces them (e.g. page by page for PDF files).
+        """
         if extract_setting.datasource_type == DatasourceType.FILE.value:
             with tempfile.TemporaryDirectory() as temp_dir:
+                cache_key = None
                 if not file_path:
                     upload_file: UploadFile = extract_setting.upload_file
                     suffix = Path(upload_file.key).suffix
+                    # uploads without a hash are not cached, their entries could not be deleted with them
+                    if upload_file.hash and ExtractCache.should_cache(
+                        suffix, upload_file.size, uses_unstructured_api=cls._uses_unstructured_api(suffix, is_automatic)
+                    ):
+                        extractor_key = ExtractCache.get_extractor_key(dify_config.ETL_TYPE, is_automatic, suffix)
+                        cache_key = ExtractCache.get_key(upload_file.tenant_id, upload_file.hash, extractor_key)
+                        documents = ExtractCache.load(cache_key)
+                        if documents is not None:
+                            yield from documents
+                            return
                     file_path = f"{temp_dir}/{next(tempfile._get_candidate_names())}{suffix}"
                     storage.download(upload_file.key, file_path)
                 input_file = Path(file_path)
@@ -154,7 +178,20 @@ class ExtractProcessor:
                     else:
                         # txt
                         extractor = TextExtractor(file_path, autodetect_encoding=True)
-                return extractor.extract()
+                documents = []
+                content_length = 0
+                for document in extractor.extract_iter():
+                    if cache_key:
+                        content_length += len(document.page_content)
+                        if ExtractCache.fits(content_length):
+                            documents.append(document)
+                        else:
+                            # too large to buffer for the cache, the rest is only streamed
+                            cache_key = None
+                            documents = []
+                    yield document
+                if cache_key:
+                    ExtractCache.save(cache_key, documents)
         elif extract_setting.datasource_type == DatasourceType.NOTION.value:
             extractor = NotionExtractor(
                 notion_workspace_id=extract_setting.notion_info.notion_workspace_id,
@@ -163,7 +200,7 @@ class ExtractProcessor:
                 document_model=extract_setting.notion_info.document,
                 tenant_id=extract_setting.notion_info.tenant_id,
             )
-            return extractor.extract()
+            yield from extractor.extract_iter()
         elif extract_setting.datasource_type == DatasourceType.WEBSITE.value:
             if extract_setting.website_info.provider == "firecrawl":
                 extractor = FirecrawlWebExtractor(
@@ -173,7 +210,7 @@ class ExtractProcessor:
                     mode=extract_setting.website_info.mode,
                     only_main_content=extract_setting.website_info.only_main_content,
                 )
-                return extractor.extract()
+                yield from extractor.extract_iter()
             elif extract_setting.website_info.provider == "jinareader":
                 extractor = JinaReaderWebExtractor(
                     url=extract_setting.website_info.url,
@@ -182,8 +219,21 @@ class ExtractProcessor:
                     mode=extract_setting.website_info.mode,
                     only_main_content=extract_setting.website_info.only_main_content,
                 )
-                return extractor.extract()
+                yield from extractor.extract_iter()
             else:
                 raise ValueError(f"Unsupported website provider: {extract_setting.website_info.provider}")
         else:
             raise ValueError(f"Unsupported datasource type: {extract_setting.datasource_type}")
+
+    @staticmethod
+    def _uses_unstructured_api(file_suffix: str, is_automatic: bool) -> bool:
+        """
+        Whether the extractor chosen for a file calls the Unstructured API, see `extract_iter`.
+        """
+        if dify_config.ETL_TYPE != "Unstructured":
+            return False
+        file_extension = file_suffix.lower()
+        if file_extension in {".msg", ".eml", ".ppt", ".pptx", ".xml", ".epub"}:
+            return True
+        # markdown and text files are extracted by the API only in automatic mode
+        return is_automatic and file_extension not in LOCAL_EXTRACTOR_FILE_EXTENSIONS
@@ -1,6 +1,7 @@
 """Abstract interface for document loader implementations."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 
 
 class BaseExtractor(ABC):
@@ -9,3 +10,10 @@ class BaseExtractor(ABC):
     @abstractmethod
     def extract(self):
         raise NotImplementedError
+
+    def extract_iter(self) -> Iterator:
+        """
+        Lazily extract documents, extractors able to produce documents incrementally (e.g. page by page)
+        override it so callers can process them before the whole file is extracted.
+        """
+        yield from self.extract()
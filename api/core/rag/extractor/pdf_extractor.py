@@ -1,12 +1,62 @@
 """Abstract interface for document loader implementations."""
 
+import multiprocessing
+import os
+import threading
+from collections import deque
 from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from typing import Optional
 
+from configs import dify_config
 from core.rag.extractor.blob.blob import Blob
 from core.rag.extractor.extractor_base import BaseExtractor
 from core.rag.models.document import Document
-from extensions.ext_storage import storage
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    Get the process pool shared by all PDF extractions in this process.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn instead of fork, forking a process with running (green) threads is not safe
+            _executor = ProcessPoolExecutor(
+                max_workers=dify_config.PDF_EXTRACT_MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+# worker processes are not inherited by forked worker processes
+os.register_at_fork(after_in_child=_reset_executor)
+
+
+def _extract_page_texts(file_path: str, start: int, stop: int) -> list[str]:
+    """Extract the text of the pages [start, stop) of a PDF file, run in a worker process."""
+    import pypdfium2
+
+    pdf_reader = pypdfium2.PdfDocument(file_path, autoclose=True)
+    try:
+        texts = []
+        for page_number in range(start, stop):
+            page = pdf_reader[page_number]
+            text_page = page.get_textpage()
+            texts.append(text_page.get_text_range())
+            text_page.close()
+            page.close()
+        return texts
+    finally:
+        pdf_reader.close()
 
 
 class PdfExtractor(BaseExtractor):
@@ -17,32 +67,15 @@ class PdfExtractor(BaseExtractor):
         file_path: Path to the file to load.
     """
 
-    def __init__(self, file_path: str, file_cache_key: Optional[str] = None):
+    def __init__(self, file_path: str):
         """Initialize with file path."""
         self._file_path = file_path
-        self._file_cache_key = file_cache_key
 
     def extract(self) -> list[Document]:
-        plaintext_file_key = ""
-        plaintext_file_exists = False
-        if self._file_cache_key:
-            try:
-                text = storage.load(self._file_cache_key).decode("utf-8")
-                plaintext_file_exists = True
-                return [Document(page_content=text)]
-            except FileNotFoundError:
-                pass
-        documents = list(self.load())
-        text_list = []
-        for document in documents:
-            text_list.append(document.page_content)
-        text = "\n\n".join(text_list)
-
-        # save plaintext file for caching
-        if not plaintext_file_exists and plaintext_file_key:
-            storage.save(plaintext_file_key, text.encode("utf-8"))
-
-        return documents
+        return list(self.load())
+
+    def extract_iter(self) -> Iterator[Document]:
+        return self.load()
 
     def load(
         self,
@@ -58,6 +91,12 @@ class PdfExtractor(BaseExtractor):
         with blob.as_bytes_io() as file_path:
             pdf_reader = pypdfium2.PdfDocument(file_path, autoclose=True)
             try:
+                page_count = len(pdf_reader)
+                if self._should_parse_in_parallel(blob, page_count):
+                    pdf_reader.close()
+                    yield from self._parse_in_parallel(blob, page_count)
+                    return
+
                 for page_number, page in enumerate(pdf_reader):
                     text_page = page.get_textpage()
                     content = text_page.get_text_range()
@@ -67,3 +106,48 @@ class PdfExtractor(BaseExtractor):
                     yield Document(page_content=content, metadata=metadata)
             finally:
                 pdf_reader.close()
+
+    @staticmethod
+    def _should_parse_in_parallel(blob: Blob, page_count: int) -> bool:
+        return (
+            dify_config.PDF_EXTRACT_MAX_WORKERS > 0
+            and page_count >= dify_config.PDF_EXTRACT_PARALLEL_MIN_PAGES
+            and blob.data is None
+            and blob.path is not None
+            # daemonic processes (e.g. of a prefork celery pool) are not allowed to have children
+            and not multiprocessing.current_process().daemon
+        )
+
+    @staticmethod
+    def _parse_in_parallel(blob: Blob, page_count: int) -> Iterator[Document]:
+        """
+        Extract page ranges in worker processes and yield the pages in order as the ranges complete.
+        Only a few ranges are in flight at a time, so memory stays bounded for very large files.
+        """
+        executor = _get_executor()
+        pages_per_task = dify_config.PDF_EXTRACT_PAGES_PER_TASK
+        page_ranges = (
+            (start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)
+        )
+
+        futures: deque[tuple[int, Future]] = deque()
+
+        def submit_next() -> None:
+            page_range = next(page_ranges, None)
+            if page_range:
+                futures.append((page_range[0], executor.submit(_extract_page_texts, str(blob.path), *page_range)))
+
+        try:
+            for _ in range(dify_config.PDF_EXTRACT_MAX_WORKERS * 2):
+                submit_next()
+
+            while futures:
+                start, future = futures.popleft()
+                texts = future.result()
+                submit_next()
+                for offset, content in enumerate(texts):
+                    metadata = {"source": blob.source, "page": start + offset}
+                    yield Document(page_content=content, metadata=metadata)
+        finally:
+            for _, future in futures:
+                future.cancel()
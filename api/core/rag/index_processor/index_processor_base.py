@@ -1,10 +1,12 @@
 """Abstract interface for document loader implementations."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from typing import Optional
 
 from configs import dify_config
 from core.model_manager import ModelInstance
+from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.extractor.entity.extract_setting import ExtractSetting
 from core.rag.models.document import Document
 from core.rag.splitter.fixed_text_splitter import (
@@ -22,12 +24,24 @@ class BaseIndexProcessor(ABC):
     def extract(self, extract_setting: ExtractSetting, **kwargs) -> list[Document]:
         raise NotImplementedError
 
+    def extract_iter(self, extract_setting: ExtractSetting, **kwargs) -> Iterator[Document]:
+        """
+        Lazily extract documents, so they can be transformed while the rest of the file is extracted.
+        """
+        yield from self.extract(extract_setting, **kwargs)
+
     @abstractmethod
-    def transform(self, documents: list[Document], **kwargs) -> list[Document]:
+    def transform(self, documents: Iterable[Document], **kwargs) -> list[Document]:
         raise NotImplementedError
 
     @abstractmethod
-    def load(self, dataset: Dataset, documents: list[Document], with_keywords: bool = True):
+    def load(
+        self,
+        dataset: Dataset,
+        documents: list[Document],
+        with_keywords: bool = True,
+        vector: Optional[Vector] = None,
+    ):
         raise NotImplementedError
 
     def clean(self, dataset: Dataset, node_ids: Optional[list[str]], with_keywords: bool = True):
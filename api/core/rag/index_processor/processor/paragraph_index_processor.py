@@ -1,6 +1,7 @@
 """Paragraph index processor."""
 
 import uuid
+from collections.abc import Iterable, Iterator
 from typing import Optional
 
 from core.rag.cleaner.clean_processor import CleanProcessor
@@ -23,7 +24,12 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
 
         return text_docs
 
-    def transform(self, documents: list[Document], **kwargs) -> list[Document]:
+    def extract_iter(self, extract_setting: ExtractSetting, **kwargs) -> Iterator[Document]:
+        return ExtractProcessor.extract_iter(
+            extract_setting=extract_setting, is_automatic=kwargs.get("process_rule_mode") == "automatic"
+        )
+
+    def transform(self, documents: Iterable[Document], **kwargs) -> list[Document]:
         # Split the text documents into nodes.
         splitter = self._get_splitter(
             processing_rule=kwargs.get("process_rule"), embedding_model_instance=kwargs.get("embedding_model_instance")
@@ -54,9 +60,15 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
             all_documents.extend(split_documents)
         return all_documents
 
-    def load(self, dataset: Dataset, documents: list[Document], with_keywords: bool = True):
+    def load(
+        self,
+        dataset: Dataset,
+        documents: list[Document],
+        with_keywords: bool = True,
+        vector: Optional[Vector] = None,
+    ):
         if dataset.indexing_technique == "high_quality":
-            vector = Vector(dataset)
+            vector = vector or Vector(dataset)
             vector.create(documents)
         if with_keywords:
             keyword = Keyword(dataset)
@@ -4,6 +4,7 @@ import logging
 import re
 import threading
 import uuid
+from collections.abc import Iterable, Iterator
 from typing import Optional
 
 import pandas as pd
@@ -29,7 +30,12 @@ class QAIndexProcessor(BaseIndexProcessor):
         )
         return text_docs
 
-    def transform(self, documents: list[Document], **kwargs) -> list[Document]:
+    def extract_iter(self, extract_setting: ExtractSetting, **kwargs) -> Iterator[Document]:
+        return ExtractProcessor.extract_iter(
+            extract_setting=extract_setting, is_automatic=kwargs.get("process_rule_mode") == "automatic"
+        )
+
+    def transform(self, documents: Iterable[Document], **kwargs) -> list[Document]:
         splitter = self._get_splitter(
             processing_rule=kwargs.get("process_rule"), embedding_model_instance=kwargs.get("embedding_model_instance")
         )
@@ -99,9 +105,15 @@ class QAIndexProcessor(BaseIndexProcessor):
             raise ValueError(str(e))
         return text_docs
 
-    def load(self, dataset: Dataset, documents: list[Document], with_keywords: bool = True):
+    def load(
+        self,
+        dataset: Dataset,
+        documents: list[Document],
+        with_keywords: bool = True,
+        vector: Optional[Vector] = None,
+    ):
         if dataset.indexing_technique == "high_quality":
-            vector = Vector(dataset)
+            vector = vector or Vector(dataset)
             vector.create(documents)
 
     def clean(self, dataset: Dataset, node_ids: Optional[list[str]], with_keywords: bool = True):
@@ -0,0 +1,70 @@
+from collections import Counter
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+
+def calculate_keyword_scores(query_keywords: Iterable[str], documents_keywords: Sequence[Iterable[str]]) -> list[float]:
+    """
+    Calculate TF-IDF cosine similarity between the query keywords and every document's keywords.
+    IDF is computed over the given documents only, smoothed as log((1 + n) / (1 + df)) + 1.
+
+    :param query_keywords: keywords extracted from the query
+    :param documents_keywords: keywords extracted from each document
+    :return: one similarity score per document
+    """
+    if not documents_keywords:
+        return []
+
+    # build the term count matrix (documents x vocabulary) in one pass
+    vocabulary: dict[str, int] = {}
+    rows, cols, counts = [], [], []
+    for row, document_keywords in enumerate(documents_keywords):
+        for keyword, count in Counter(document_keywords).items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(keyword, len(vocabulary)))
+            counts.append(count)
+    if not vocabulary:
+        return [0.0] * len(documents_keywords)
+
+    term_counts = np.zeros((len(documents_keywords), len(vocabulary)), dtype=np.float64)
+    term_counts[rows, cols] = counts
+
+    # IDF of every keyword
+    total_documents = len(documents_keywords)
+    document_frequency = np.count_nonzero(term_counts, axis=0)
+    idf = np.log((1 + total_documents) / (1 + document_frequency)) + 1
+
+    # query keywords not seen in any document have no weight
+    query_tf = np.zeros(len(vocabulary), dtype=np.float64)
+    for keyword, count in Counter(query_keywords).items():
+        index = vocabulary.get(keyword)
+        if index is not None:
+            query_tf[index] = count
+
+    documents_tfidf = term_counts * idf
+    query_tfidf = query_tf * idf
+
+    return _cosine_similarities(query_tfidf, documents_tfidf).tolist()
+
+
+def calculate_vector_scores(query_vector: Sequence[float], document_vectors: Sequence[Sequence[float]]) -> list[float]:
+    """
+    Calculate cosine similarity between the query vector and every document vector.
+
+    :param query_vector: query embedding
+    :param document_vectors: document embeddings, all of the query's dimension
+    :return: one similarity score per document
+    """
+    if not document_vectors:
+        return []
+
+    return _cosine_similarities(
+        np.asarray(query_vector, dtype=np.float64), np.asarray(document_vectors, dtype=np.float64)
+    ).tolist()
+
+
+def _cosine_similarities(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    denominators = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    numerators = matrix @ query
+    return np.divide(numerators, denominators, out=np.zeros_like(numerators), where=denominators != 0)
@@ -1,9 +1,10 @@
 import re
-from collections import defaultdict
-from collections.abc import Mapping, Sequence
-from typing import Any, Union
+import threading
+from collections.abc import Hashable, Mapping, Sequence
+from functools import lru_cache
+from typing import Any, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from core.file import File, FileAttribute, file_manager
 from core.variables import Segment, SegmentGroup, Variable
@@ -18,15 +19,35 @@ VariableValue = Union[str, int, float, dict, list, File]
 
 VARIABLE_PATTERN = re.compile(r"\{\{#([a-zA-Z0-9_]{1,50}(?:\.[a-zA-Z_][a-zA-Z0-9_]{0,29}){1,10})#\}\}")
 
+FILE_ATTRIBUTES = frozenset(item.value for item in FileAttribute)
+
+
+def _selector_key(selector: Sequence[str]) -> Hashable:
+    """
+    Second-level key of a selector, most selectors are (node id, variable name) and are keyed by the name alone
+    """
+    if len(selector) == 2:
+        return selector[1]
+    return tuple(selector[1:])
+
+
+@lru_cache(maxsize=1024)
+def _compile_template(template: str) -> tuple[tuple[str, Optional[tuple[str, ...]]], ...]:
+    """
+    Split a template into (text, selector) parts, selector is None for plain text parts
+    """
+    parts = VARIABLE_PATTERN.split(template)
+    return tuple((part, tuple(part.split(".")) if "." in part else None) for part in parts if part)
+
 
 class VariablePool(BaseModel):
     # Variable dictionary is a dictionary for looking up variables by their selector.
     # The first element of the selector is the node id, it's the first-level key in the dictionary.
-    # Other elements of the selector are the keys in the second-level dictionary. To get the key, we hash the
-    # elements of the selector except the first one.
-    variable_dictionary: dict[str, dict[int, Segment]] = Field(
+    # Other elements of the selector are the keys in the second-level dictionary, see `_selector_key`.
+    # Second-level dictionaries are copy-on-write: forks share them until either side writes to a node.
+    variable_dictionary: dict[str, dict[Hashable, Segment]] = Field(
         description="Variables mapping",
-        default=defaultdict(dict),
+        default_factory=dict,
     )
     # TODO: This user inputs is not used for pool.
     user_inputs: Mapping[str, Any] = Field(
@@ -44,6 +65,11 @@ class VariablePool(BaseModel):
         default_factory=list,
     )
 
+    # node ids whose second-level dictionary is not shared with any fork
+    _owned_node_ids: set[str] = PrivateAttr(default_factory=set)
+    # guards the ownership of the second-level dictionaries, the pool can be forked while other threads write to it
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
     def __init__(
         self,
         *,
@@ -100,8 +126,8 @@ class VariablePool(BaseModel):
         else:
             v = variable_factory.build_segment(value)
 
-        hash_key = hash(tuple(selector[1:]))
-        self.variable_dictionary[selector[0]][hash_key] = v
+        with self._lock:
+            self._get_writable_variables(selector[0])[_selector_key(selector)] = v
 
     def get(self, selector: Sequence[str], /) -> Segment | None:
         """
@@ -119,13 +145,13 @@ class VariablePool(BaseModel):
         if len(selector) < 2:
             return None
 
-        hash_key = hash(tuple(selector[1:]))
-        value = self.variable_dictionary[selector[0]].get(hash_key)
+        variables = self.variable_dictionary.get(selector[0])
+        value = variables.get(_selector_key(selector)) if variables else None
 
         if value is None:
             selector, attr = selector[:-1], selector[-1]
             # Python support `attr in FileAttribute` after 3.12
-            if attr not in {item.value for item in FileAttribute}:
+            if attr not in FILE_ATTRIBUTES:
                 return None
             value = self.get(selector)
             if not isinstance(value, FileSegment):
@@ -148,17 +174,47 @@ class VariablePool(BaseModel):
         """
         if not selector:
             return
-        if len(selector) == 1:
-            self.variable_dictionary[selector[0]] = {}
-            return
-        hash_key = hash(tuple(selector[1:]))
-        self.variable_dictionary[selector[0]].pop(hash_key, None)
+        with self._lock:
+            if len(selector) == 1:
+                self.variable_dictionary[selector[0]] = {}
+                self._owned_node_ids.add(selector[0])
+                return
+            if selector[0] not in self.variable_dictionary:
+                return
+            self._get_writable_variables(selector[0]).pop(_selector_key(selector), None)
+
+    def fork(self) -> "VariablePool":
+        """
+        Fork the variable pool, e.g. for a parallel iteration item.
+        The fork reads everything in this pool, writes on either side are not visible to the other one.
+        Variables of a node are only copied when the node is first written to after the fork.
+        """
+        with self._lock:
+            variable_pool = self.model_copy(update={"variable_dictionary": dict(self.variable_dictionary)})
+            variable_pool._owned_node_ids = set()
+            variable_pool._lock = threading.Lock()
+            # the dictionaries are shared now, this pool has to copy them before writing too
+            self._owned_node_ids = set()
+        return variable_pool
+
+    def _get_writable_variables(self, node_id: str) -> dict[Hashable, Segment]:
+        """
+        Get the second-level dictionary of a node to write to, copied first if it is shared.
+        The caller holds the lock.
+        """
+        variables = self.variable_dictionary.get(node_id)
+        if variables is None:
+            variables = self.variable_dictionary[node_id] = {}
+            self._owned_node_ids.add(node_id)
+        elif node_id not in self._owned_node_ids:
+            variables = self.variable_dictionary[node_id] = dict(variables)
+            self._owned_node_ids.add(node_id)
+        return variables
 
     def convert_template(self, template: str, /):
-        parts = VARIABLE_PATTERN.split(template)
         segments = []
-        for part in filter(lambda x: x, parts):
-            if "." in part and (variable := self.get(part.split("."))):
+        for part, selector in _compile_template(template):
+            if selector and (variable := self.get(selector)):
                 segments.append(variable)
             else:
                 segments.append(variable_factory.build_segment(part))
@@ -2,8 +2,10 @@ import uuid
 from collections.abc import Mapping
 from typing import Any, Optional, cast
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
 from core.workflow.graph_engine.entities.run_condition import RunCondition
 from core.workflow.nodes import NodeType
 from core.workflow.nodes.answer.answer_stream_generate_router import AnswerStreamGeneratorRouter
@@ -11,6 +13,9 @@ from core.workflow.nodes.answer.entities import AnswerStreamGenerateRoute
 from core.workflow.nodes.end.end_stream_generate_router import EndStreamGeneratorRouter
 from core.workflow.nodes.end.entities import EndStreamParam
 
+# process-local cache of compiled graphs: (cache key, root node id) -> graph
+compiled_graph_cache = LRUCache(capacity=dify_config.WORKFLOW_GRAPH_CACHE_MAX_SIZE)
+
 
 class GraphEdge(BaseModel):
     source_node_id: str = Field(..., description="source node id")
@@ -31,6 +36,8 @@ class GraphParallel(BaseModel):
 
 
 class Graph(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     root_node_id: str = Field(..., description="root node id of the graph")
     node_ids: list[str] = Field(default_factory=list, description="graph node ids")
     node_id_config_mapping: dict[str, dict] = Field(
@@ -50,16 +57,35 @@ class Graph(BaseModel):
     )
     answer_stream_generate_routes: AnswerStreamGenerateRoute = Field(..., description="answer stream generate routes")
     end_stream_param: EndStreamParam = Field(..., description="end stream param")
+    cache_key: Optional[str] = Field(default=None, description="key the graph config is cached by, if any")
 
     @classmethod
-    def init(cls, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None) -> "Graph":
+    def init(
+        cls, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None, cache_key: Optional[str] = None
+    ) -> "Graph":
         """
         Init graph
 
         :param graph_config: graph config
         :param root_node_id: root node id
+        :param cache_key: key identifying the graph config (e.g. workflow unique hash),
+            compiled graphs are shared per process by cache key and root node id
         :return: graph
         """
+        if not cache_key:
+            return cls._init(graph_config=graph_config, root_node_id=root_node_id)
+
+        graph = compiled_graph_cache.get((cache_key, root_node_id))
+        if graph is None:
+            graph = cls._init(graph_config=graph_config, root_node_id=root_node_id, cache_key=cache_key)
+            compiled_graph_cache.put((cache_key, root_node_id), graph)
+
+        return graph
+
+    @classmethod
+    def _init(
+        cls, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None, cache_key: Optional[str] = None
+    ) -> "Graph":
         # edge configs
         edge_configs = graph_config.get("edges")
         if edge_configs is None:
@@ -187,6 +213,7 @@ class Graph(BaseModel):
             node_parallel_mapping=node_parallel_mapping,
             answer_stream_generate_routes=answer_stream_generate_routes,
             end_stream_param=end_stream_param,
+            cache_key=cache_key,
         )
 
         return graph
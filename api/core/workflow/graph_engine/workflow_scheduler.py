@@ -0,0 +1,190 @@
+import logging
+import os
+import threading
+from collections import Counter, deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+# marks the threads running scheduler tasks
+_task_context = threading.local()
+
+
+@dataclass
+class _Task:
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    tenant_id: str
+    app_id: str
+    future: Future = field(default_factory=Future)
+
+
+class WorkflowScheduler:
+    """
+    Process-wide bounded thread pool running the parallel work (parallel branches, parallel iterations)
+    of all workflow runs in the process.
+
+    Submitting never blocks: a task is queued and started, in submission order, as soon as the pool,
+    its tenant and its app are under their concurrency quotas, so the submitting run keeps streaming
+    its events while its tasks wait for a slot.
+
+    Tasks submitted by a running task (e.g. the branches of a nested parallel) belong to work that was
+    already admitted, and the submitting task waits for them, so queueing them behind a pool full of waiting
+    parents could deadlock it. They skip the queue and start on the pool if the quotas allow, otherwise they
+    run right away in the submitting task's thread, which already holds a slot.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_workers_per_tenant: int,
+        max_workers_per_app: int,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_workers_per_tenant = max_workers_per_tenant
+        self.max_workers_per_app = max_workers_per_app
+
+        self._reset()
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._running = 0
+        self._tenant_running: Counter[str] = Counter()
+        self._app_running: Counter[str] = Counter()
+        self._pending: deque[_Task] = deque()
+        self._submitted_count = 0
+        self._inline_count = 0
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, tenant_id: str, app_id: str, **kwargs: Any) -> Future:
+        """
+        Submit a task of a workflow run.
+
+        :param fn: task
+        :param tenant_id: tenant id of the workflow run
+        :param app_id: app id of the workflow run
+        :return: future of the task
+        """
+        task = _Task(fn=fn, args=args, kwargs=kwargs, tenant_id=tenant_id, app_id=app_id)
+        with self._lock:
+            self._submitted_count += 1
+            if not getattr(_task_context, "in_task", False):
+                self._pending.append(task)
+                self._dispatch()
+                return task.future
+
+            run_inline = not self._has_capacity(tenant_id, app_id)
+            if run_inline:
+                self._inline_count += 1
+            else:
+                self._start(task)
+
+        if run_inline:
+            logger.debug(f"Workflow scheduler is full, running nested task of app {app_id} in its parent's thread")
+            self._run_task(task, False)
+        return task.future
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get usage metrics of the scheduler in this process.
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "pending": len(self._pending),
+                "tenants": len(self._tenant_running),
+                "apps": len(self._app_running),
+                "submitted": self._submitted_count,
+                "inline": self._inline_count,
+            }
+
+    def _dispatch(self) -> None:
+        """
+        Start the pending tasks that fit in the quotas, the caller holds the lock.
+        Tasks of a tenant or app at its quota keep their place in the queue without blocking the others.
+        """
+        skipped: deque[_Task] = deque()
+        while self._pending and self._running < self.max_workers:
+            task = self._pending.popleft()
+            if not self._has_capacity(task.tenant_id, task.app_id):
+                skipped.append(task)
+                continue
+
+            self._start(task)
+
+        if skipped:
+            skipped.extend(self._pending)
+            self._pending = skipped
+
+    def _start(self, task: _Task) -> None:
+        """
+        Start a task on the pool, the caller holds the lock and checked the quotas.
+        """
+        self._acquire(task.tenant_id, task.app_id)
+        try:
+            self._get_executor().submit(self._run_task, task, True)
+        except Exception as e:
+            self._release_slot(task.tenant_id, task.app_id)
+            task.future.set_exception(e)
+
+    def _run_task(self, task: _Task, admitted: bool) -> None:
+        # inline tasks run in the thread of a task, which is already marked
+        _task_context.in_task = True
+        try:
+            if not task.future.set_running_or_notify_cancel():
+                return
+
+            try:
+                result = task.fn(*task.args, **task.kwargs)
+            except BaseException as e:
+                task.future.set_exception(e)
+            else:
+                task.future.set_result(result)
+        finally:
+            if admitted:
+                with self._lock:
+                    self._release_slot(task.tenant_id, task.app_id)
+                    self._dispatch()
+
+    def _has_capacity(self, tenant_id: str, app_id: str) -> bool:
+        return (
+            self._running < self.max_workers
+            and self._tenant_running[tenant_id] < self.max_workers_per_tenant
+            and self._app_running[app_id] < self.max_workers_per_app
+        )
+
+    def _acquire(self, tenant_id: str, app_id: str) -> None:
+        self._running += 1
+        self._tenant_running[tenant_id] += 1
+        self._app_running[app_id] += 1
+
+    def _release_slot(self, tenant_id: str, app_id: str) -> None:
+        self._running -= 1
+        self._tenant_running[tenant_id] -= 1
+        if self._tenant_running[tenant_id] <= 0:
+            del self._tenant_running[tenant_id]
+        self._app_running[app_id] -= 1
+        if self._app_running[app_id] <= 0:
+            del self._app_running[app_id]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="workflow")
+        return self._executor
+
+
+workflow_scheduler = WorkflowScheduler(
+    max_workers=dify_config.WORKFLOW_SCHEDULER_MAX_WORKERS,
+    max_workers_per_tenant=dify_config.WORKFLOW_SCHEDULER_MAX_WORKERS_PER_TENANT,
+    max_workers_per_app=dify_config.WORKFLOW_SCHEDULER_MAX_WORKERS_PER_APP,
+)
+
+# worker threads and their accounting are not inherited by forked worker processes
+os.register_at_fork(after_in_child=workflow_scheduler._reset)
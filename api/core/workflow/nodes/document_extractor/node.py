@@ -1,4 +1,5 @@
 import csv
+import hashlib
 import io
 
 import docx
@@ -12,6 +13,8 @@ from unstructured.partition.pptx import partition_pptx
 
 from core.file import File, FileTransferMethod, file_manager
 from core.helper import ssrf_proxy
+from core.rag.extractor.extract_cache import ExtractCache
+from core.rag.models.document import Document
 from core.variables import ArrayFileSegment
 from core.variables.segments import FileSegment
 from core.workflow.entities.node_entities import NodeRunResult
@@ -186,10 +189,26 @@ def _extract_text_from_file(file: File):
     if file.mime_type is None:
         raise UnsupportedFileTypeError("Unable to determine file type: MIME type is missing")
     file_content = _download_file_content(file)
+
+    # only uploaded files are cached, their cache entries are deleted with them
+    cache_key = None
+    if file.transfer_method == FileTransferMethod.LOCAL_FILE and ExtractCache.should_cache(
+        file.extension or "", len(file_content)
+    ):
+        content_hash = hashlib.sha3_256(file_content).hexdigest()
+        extractor_key = ExtractCache.get_document_extractor_key(file.extension or "")
+        cache_key = ExtractCache.get_key(file.tenant_id, content_hash, extractor_key)
+        documents = ExtractCache.load(cache_key)
+        if documents:
+            return documents[0].page_content
+
     if file.transfer_method == FileTransferMethod.REMOTE_URL:
         extracted_text = _extract_text_by_mime_type(file_content=file_content, mime_type=file.mime_type)
     else:
         extracted_text = _extract_text_by_file_extension(file_content=file_content, file_extension=file.extension)
+
+    if cache_key:
+        ExtractCache.save(cache_key, [Document(page_content=extracted_text)])
     return extracted_text
 
 
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Any, Optional
 
 from pydantic import Field
@@ -5,6 +6,15 @@ from pydantic import Field
 from core.workflow.nodes.base import BaseIterationNodeData, BaseIterationState, BaseNodeData
 
 
+class ErrorHandleMode(str, Enum):
+    """
+    How an iteration handles a failed item.
+    """
+
+    TERMINATED = "terminated"  # fail the iteration on the first failed item
+    CONTINUE_ON_ERROR = "continue-on-error"  # use None as the output of failed items and go on
+
+
 class IterationNodeData(BaseIterationNodeData):
     """
     Iteration Node Data.
@@ -13,6 +23,9 @@ class IterationNodeData(BaseIterationNodeData):
     parent_loop_id: Optional[str] = None  # redundant field, not used currently
     iterator_selector: list[str]  # variable selector
     output_selector: list[str]  # output selector
+    is_parallel: bool = False  # run items concurrently
+    parallel_nums: int = Field(default=10, ge=1)  # max number of items running at the same time in parallel mode
+    error_handle_mode: ErrorHandleMode = ErrorHandleMode.TERMINATED
 
 
 class IterationStartNodeData(BaseNodeData):
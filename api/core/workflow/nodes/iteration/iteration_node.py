@@ -1,7 +1,11 @@
 import logging
+import queue
+import threading
 from collections.abc import Generator, Mapping, Sequence
 from datetime import datetime, timezone
-from typing import Any, cast
+from typing import Any, NamedTuple, Optional, cast
+
+from flask import Flask, current_app
 
 from configs import dify_config
 from core.model_runtime.utils.encoders import jsonable_encoder
@@ -24,12 +28,24 @@ from core.workflow.graph_engine.entities.graph import Graph
 from core.workflow.nodes.base import BaseNode
 from core.workflow.nodes.enums import NodeType
 from core.workflow.nodes.event import NodeEvent, RunCompletedEvent
-from core.workflow.nodes.iteration.entities import IterationNodeData
+from core.workflow.nodes.iteration.entities import ErrorHandleMode, IterationNodeData
+from extensions.ext_database import db
 from models.workflow import WorkflowNodeExecutionStatus
 
 logger = logging.getLogger(__name__)
 
 
+class IterationItemRunResult(NamedTuple):
+    """
+    Result of one item run in parallel mode.
+    """
+
+    index: int
+    output: Any
+    error: Optional[str]
+    total_tokens: int
+
+
 class IterationNode(BaseNode[IterationNodeData]):
     """
     Iteration Node.
@@ -71,11 +87,19 @@ class IterationNode(BaseNode[IterationNodeData]):
         root_node_id = self.node_data.start_node_id
 
         # init graph
-        iteration_graph = Graph.init(graph_config=graph_config, root_node_id=root_node_id)
+        iteration_graph = Graph.init(
+            graph_config=graph_config, root_node_id=root_node_id, cache_key=self.graph.cache_key
+        )
 
         if not iteration_graph:
             raise ValueError("iteration graph not found")
 
+        if self.node_data.is_parallel:
+            yield from self._run_parallel(
+                iteration_graph=iteration_graph, iterator_list_value=iterator_list_value, inputs=inputs
+            )
+            return
+
         variable_pool = self.graph_runtime_state.variable_pool
 
         # append iteration variable (item, index) to variable pool
@@ -127,6 +151,7 @@ class IterationNode(BaseNode[IterationNodeData]):
         outputs: list[Any] = []
         try:
             for _ in range(len(iterator_list_value)):
+                item_failed = False
                 # run workflow
                 rst = graph_engine.run()
                 for event in rst:
@@ -163,6 +188,10 @@ class IterationNode(BaseNode[IterationNodeData]):
                         yield event
                     elif isinstance(event, BaseGraphEvent):
                         if isinstance(event, GraphRunFailedEvent):
+                            if self.node_data.error_handle_mode == ErrorHandleMode.CONTINUE_ON_ERROR:
+                                item_failed = True
+                                break
+
                             # iteration run failed
                             yield IterationRunFailedEvent(
                                 iteration_id=self.id,
@@ -190,7 +219,9 @@ class IterationNode(BaseNode[IterationNodeData]):
 
                 # append to iteration output variable list
                 current_iteration_output_variable = variable_pool.get(self.node_data.output_selector)
-                if current_iteration_output_variable is None:
+                if item_failed:
+                    current_iteration_output = None
+                elif current_iteration_output_variable is None:
                     yield RunCompletedEvent(
                         run_result=NodeRunResult(
                             status=WorkflowNodeExecutionStatus.FAILED,
@@ -198,7 +229,8 @@ class IterationNode(BaseNode[IterationNodeData]):
                         )
                     )
                     return
-                current_iteration_output = current_iteration_output_variable.to_object()
+                else:
+                    current_iteration_output = current_iteration_output_variable.to_object()
                 outputs.append(current_iteration_output)
 
                 # remove all nodes outputs from variable pool
@@ -269,6 +301,258 @@ class IterationNode(BaseNode[IterationNodeData]):
             variable_pool.remove([self.node_id, "index"])
             variable_pool.remove([self.node_id, "item"])
 
+    def _run_parallel(
+        self, iteration_graph: Graph, iterator_list_value: list[Any], inputs: Mapping[str, Any]
+    ) -> Generator[NodeEvent | InNodeEvent, None, None]:
+        """
+        Run the items concurrently on the workflow thread pool, each on its own fork of the variable pool.
+        Outputs keep the order of the items, next events are yielded as items finish.
+        """
+        from core.workflow.graph_engine.graph_engine import GraphEngine, GraphEngineThreadPool
+
+        thread_pool_id = self.thread_pool_id
+        thread_pool = GraphEngine.workflow_thread_pool_mapping.get(thread_pool_id) if thread_pool_id else None
+        if not thread_pool:
+            # node run outside of a graph engine, e.g. in tests
+            thread_pool = GraphEngineThreadPool(tenant_id=self.tenant_id, app_id=self.app_id)
+        # items beyond the app quota of the workflow scheduler would only wait for a slot
+        max_concurrency = min(self.node_data.parallel_nums, dify_config.WORKFLOW_SCHEDULER_MAX_WORKERS_PER_APP)
+
+        start_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        yield IterationRunStartedEvent(
+            iteration_id=self.id,
+            iteration_node_id=self.node_id,
+            iteration_node_type=self.node_type,
+            iteration_node_data=self.node_data,
+            start_at=start_at,
+            inputs=inputs,
+            metadata={"iterator_length": len(iterator_list_value)},
+            predecessor_node_id=self.previous_node_id,
+        )
+
+        yield IterationRunNextEvent(
+            iteration_id=self.id,
+            iteration_node_id=self.node_id,
+            iteration_node_type=self.node_type,
+            iteration_node_data=self.node_data,
+            index=0,
+            pre_iteration_output=None,
+        )
+
+        flask_app = current_app._get_current_object()  # type: ignore[attr-defined]
+        q: queue.Queue = queue.Queue()
+        stop_event = threading.Event()
+        outputs: list[Any] = [None] * len(iterator_list_value)
+        total_tokens = 0
+        submitted_count = 0
+        running_count = 0
+        finished_count = 0
+        try:
+            while finished_count < len(iterator_list_value):
+                while running_count < max_concurrency and submitted_count < len(iterator_list_value):
+                    thread_pool.submit(
+                        self._run_parallel_item,
+                        flask_app=flask_app,
+                        q=q,
+                        stop_event=stop_event,
+                        iteration_graph=iteration_graph,
+                        thread_pool_id=thread_pool_id,
+                        index=submitted_count,
+                        item=iterator_list_value[submitted_count],
+                    )
+                    submitted_count += 1
+                    running_count += 1
+
+                try:
+                    index, event = q.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+                if not isinstance(event, IterationItemRunResult):
+                    event = self._tag_item_event(event, index)
+                    if event:
+                        yield event
+                    continue
+
+                running_count -= 1
+                finished_count += 1
+                total_tokens += event.total_tokens
+                if event.error and self.node_data.error_handle_mode != ErrorHandleMode.CONTINUE_ON_ERROR:
+                    # iteration run failed, let the running items stop early
+                    stop_event.set()
+                    yield IterationRunFailedEvent(
+                        iteration_id=self.id,
+                        iteration_node_id=self.node_id,
+                        iteration_node_type=self.node_type,
+                        iteration_node_data=self.node_data,
+                        start_at=start_at,
+                        inputs=inputs,
+                        outputs={"output": jsonable_encoder(outputs)},
+                        steps=len(iterator_list_value),
+                        metadata={"total_tokens": total_tokens},
+                        error=event.error,
+                    )
+
+                    yield RunCompletedEvent(
+                        run_result=NodeRunResult(
+                            status=WorkflowNodeExecutionStatus.FAILED,
+                            error=event.error,
+                        )
+                    )
+                    return
+
+                outputs[event.index] = event.output
+
+                # as in sequential mode, the output is the pre iteration output of the index after its item
+                yield IterationRunNextEvent(
+                    iteration_id=self.id,
+                    iteration_node_id=self.node_id,
+                    iteration_node_type=self.node_type,
+                    iteration_node_data=self.node_data,
+                    index=event.index + 1,
+                    pre_iteration_output=jsonable_encoder(event.output),
+                )
+
+            yield IterationRunSucceededEvent(
+                iteration_id=self.id,
+                iteration_node_id=self.node_id,
+                iteration_node_type=self.node_type,
+                iteration_node_data=self.node_data,
+                start_at=start_at,
+                inputs=inputs,
+                outputs={"output": jsonable_encoder(outputs)},
+                steps=len(iterator_list_value),
+                metadata={"total_tokens": total_tokens},
+            )
+
+            yield RunCompletedEvent(
+                run_result=NodeRunResult(
+                    status=WorkflowNodeExecutionStatus.SUCCEEDED, outputs={"output": jsonable_encoder(outputs)}
+                )
+            )
+        except Exception as e:
+            # iteration run failed
+            logger.exception("Iteration run failed")
+            stop_event.set()
+            yield IterationRunFailedEvent(
+                iteration_id=self.id,
+                iteration_node_id=self.node_id,
+                iteration_node_type=self.node_type,
+                iteration_node_data=self.node_data,
+                start_at=start_at,
+                inputs=inputs,
+                outputs={"output": jsonable_encoder(outputs)},
+                steps=len(iterator_list_value),
+                metadata={"total_tokens": total_tokens},
+                error=str(e),
+            )
+
+            yield RunCompletedEvent(
+                run_result=NodeRunResult(
+                    status=WorkflowNodeExecutionStatus.FAILED,
+                    error=str(e),
+                )
+            )
+        finally:
+            # also when the run is closed early, e.g. the workflow is stopped, the items left must not run
+            stop_event.set()
+
+    def _run_parallel_item(
+        self,
+        flask_app: Flask,
+        q: queue.Queue,
+        stop_event: threading.Event,
+        iteration_graph: Graph,
+        thread_pool_id: Optional[str],
+        index: int,
+        item: Any,
+    ) -> None:
+        """
+        Run one item in parallel mode, puts (index, event) of its graph events and finally its result into the queue
+        """
+        from core.workflow.graph_engine.graph_engine import GraphEngine
+
+        if stop_event.is_set():
+            # the iteration has already ended, e.g. the item was waiting for a worker
+            return
+
+        with flask_app.app_context():
+            total_tokens = 0
+            try:
+                variable_pool = self.graph_runtime_state.variable_pool.fork()
+                variable_pool.add([self.node_id, "index"], index)
+                variable_pool.add([self.node_id, "item"], item)
+
+                graph_engine = GraphEngine(
+                    tenant_id=self.tenant_id,
+                    app_id=self.app_id,
+                    workflow_type=self.workflow_type,
+                    workflow_id=self.workflow_id,
+                    user_id=self.user_id,
+                    user_from=self.user_from,
+                    invoke_from=self.invoke_from,
+                    call_depth=self.workflow_call_depth,
+                    graph=iteration_graph,
+                    graph_config=self.graph_config,
+                    variable_pool=variable_pool,
+                    max_execution_steps=dify_config.WORKFLOW_MAX_EXECUTION_STEPS,
+                    max_execution_time=dify_config.WORKFLOW_MAX_EXECUTION_TIME,
+                    thread_pool_id=thread_pool_id,
+                )
+
+                error = None
+                generator = graph_engine.run()
+                for event in generator:
+                    # the engine yields the started event of a node before running it,
+                    # so checking each event stops the item before its next node runs
+                    if stop_event.is_set():
+                        generator.close()
+                        return
+                    if isinstance(event, GraphRunFailedEvent):
+                        error = event.error
+                    elif not isinstance(event, BaseGraphEvent):
+                        q.put((index, event))
+                total_tokens = graph_engine.graph_runtime_state.total_tokens
+
+                output = None
+                if not error:
+                    output_variable = variable_pool.get(self.node_data.output_selector)
+                    if output_variable is None:
+                        error = f"Iteration output variable {self.node_data.output_selector} not found"
+                    else:
+                        output = output_variable.to_object()
+
+                q.put((index, IterationItemRunResult(index, output, error, total_tokens)))
+            except Exception as e:
+                logger.exception(f"Iteration item {index} run failed")
+                q.put((index, IterationItemRunResult(index, None, str(e), total_tokens)))
+            finally:
+                db.session.remove()
+
+    def _tag_item_event(self, event: Any, index: int) -> Optional[InNodeEvent]:
+        """
+        Mark an event of an item run in parallel mode as inside this iteration, None if it is not passed on
+        """
+        if isinstance(event, (BaseNodeEvent | BaseParallelBranchEvent)) and not event.in_iteration_id:
+            event.in_iteration_id = self.node_id
+
+        if (
+            isinstance(event, BaseNodeEvent)
+            and event.node_type == NodeType.ITERATION_START
+            and not isinstance(event, NodeRunStreamChunkEvent)
+        ):
+            return None
+
+        if isinstance(event, NodeRunSucceededEvent) and event.route_node_state.node_run_result:
+            metadata = event.route_node_state.node_run_result.metadata or {}
+            if NodeRunMetadataKey.ITERATION_ID not in metadata:
+                metadata[NodeRunMetadataKey.ITERATION_ID] = self.node_id
+                metadata[NodeRunMetadataKey.ITERATION_INDEX] = index
+                event.route_node_state.node_run_result.metadata = metadata
+
+        return cast(InNodeEvent, event)
+
     @classmethod
     def _extract_variable_selector_to_variable_mapping(
         cls,
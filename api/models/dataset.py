@@ -10,6 +10,7 @@ import re
 import time
 from json import JSONDecodeError
 
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -665,6 +666,21 @@ class DatasetKeywordTable(db.Model):
                 return None
 
 
+class DatasetKeywordPosting(db.Model):
+    __tablename__ = "dataset_keyword_postings"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="dataset_keyword_posting_pkey"),
+        db.UniqueConstraint("dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_keyword_idx"),
+        db.Index("dataset_keyword_posting_node_idx", "dataset_id", "index_node_id"),
+    )
+
+    id = db.Column(StringUUID, primary_key=True, server_default=db.text("uuid_generate_v4()"))
+    dataset_id = db.Column(StringUUID, nullable=False)
+    keyword = db.Column(db.String(255), nullable=False)
+    index_node_id = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+
+
 class Embedding(db.Model):
     __tablename__ = "embeddings"
     __table_args__ = (
@@ -682,11 +698,29 @@ class Embedding(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
     provider_name = db.Column(db.String(255), nullable=False, server_default=db.text("''::character varying"))
 
+    # header byte of the compact little-endian float32 encoding.
+    # legacy rows are pickled lists, whose payload always starts with the pickle PROTO opcode (0x80).
+    FLOAT32_FORMAT_HEADER = b"\x01"
+
     def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.embedding = self.encode_embedding(embedding_data)
 
     def get_embedding(self) -> list[float]:
-        return pickle.loads(self.embedding)
+        return self.decode_embedding(self.embedding)
+
+    def is_legacy_format(self) -> bool:
+        return bytes(self.embedding[:1]) != self.FLOAT32_FORMAT_HEADER
+
+    @classmethod
+    def encode_embedding(cls, embedding_data: list[float]) -> bytes:
+        return cls.FLOAT32_FORMAT_HEADER + np.asarray(embedding_data, dtype="<f4").tobytes()
+
+    @classmethod
+    def decode_embedding(cls, data: bytes) -> list[float]:
+        data = bytes(data)
+        if data[:1] == cls.FLOAT32_FORMAT_HEADER:
+            return np.frombuffer(data, dtype="<f4", offset=1).tolist()
+        return pickle.loads(data)
 
 
 class DatasetCollectionBinding(db.Model):
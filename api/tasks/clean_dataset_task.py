@@ -4,6 +4,7 @@ import time
 import click
 from celery import shared_task
 
+from core.rag.extractor.extract_cache import ExtractCache
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from extensions.ext_database import db
 from extensions.ext_storage import storage
@@ -89,6 +90,7 @@ def clean_dataset_task(
                                 )
                                 if not file:
                                     continue
+                                ExtractCache.delete_upload_file_entries(file)
                                 storage.delete(file.key)
                                 db.session.delete(file)
                 except Exception:
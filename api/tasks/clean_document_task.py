@@ -5,6 +5,7 @@ from typing import Optional
 import click
 from celery import shared_task
 
+from core.rag.extractor.extract_cache import ExtractCache
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from extensions.ext_database import db
 from extensions.ext_storage import storage
@@ -50,6 +51,7 @@ def clean_document_task(document_id: str, dataset_id: str, doc_form: str, file_i
                     storage.delete(file.key)
                 except Exception:
                     logging.exception("Delete file failed when document deleted, file_id: {}".format(file_id))
+                ExtractCache.delete_upload_file_entries(file)
                 db.session.delete(file)
                 db.session.commit()
 
@@ -51,6 +51,7 @@ def test_dify_config(example_env_file):
 
     # annotated field with default value
     assert config.HTTP_REQUEST_MAX_READ_TIMEOUT == 60
+    assert config.CODE_EXECUTION_BATCH_MAX_WORKERS == 10
 
     # annotated field with configured value
     assert config.HTTP_REQUEST_MAX_WRITE_TIMEOUT == 30
@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import AppQueueEvent, QueuePingEvent, QueueStopEvent
+
+
+class _QueueManager(AppQueueManager):
+    def _publish(self, event: AppQueueEvent, pub_from: PublishFrom) -> None:
+        self._q.put(event)
+        if isinstance(event, QueueStopEvent):
+            self.stop_listen()
+
+
+@pytest.fixture
+def redis_client(mocker):
+    client = MagicMock()
+    client.get.return_value = None
+    mocker.patch("core.app.apps.base_app_queue_manager.redis_client", client)
+    return client
+
+
+def test_is_stopped_is_rate_limited(redis_client):
+    queue_manager = _QueueManager(task_id="task", user_id="user", invoke_from=InvokeFrom.SERVICE_API)
+    queue_manager._stop_check_interval = 60
+
+    assert not queue_manager._is_stopped()
+    assert not queue_manager._is_stopped()
+    assert redis_client.get.call_count == 1
+
+    # once seen, the stop flag is not read again
+    queue_manager._last_stop_check_time = 0.0
+    redis_client.get.return_value = b"1"
+    assert queue_manager._is_stopped()
+    assert queue_manager._is_stopped()
+    assert redis_client.get.call_count == 2
+
+
+def test_listen_checks_stop_flag_once_per_batch(redis_client):
+    queue_manager = _QueueManager(task_id="task", user_id="user", invoke_from=InvokeFrom.SERVICE_API)
+    queue_manager._stop_check_interval = 0
+    queue_manager.LISTEN_BATCH_SIZE = 10
+
+    events = [QueuePingEvent() for _ in range(25)]
+    for event in events:
+        queue_manager._q.put(event)
+    queue_manager.stop_listen()
+
+    assert list(queue_manager.listen()) == events
+    assert redis_client.get.call_count == 3
+
+
+def test_listen_publishes_stop_event_when_stopped(redis_client):
+    queue_manager = _QueueManager(task_id="task", user_id="user", invoke_from=InvokeFrom.SERVICE_API)
+    queue_manager._stop_check_interval = 0
+    redis_client.get.return_value = b"1"
+
+    queue_manager._q.put(QueuePingEvent())
+    messages = list(queue_manager.listen())
+
+    assert isinstance(messages[0], QueuePingEvent)
+    assert isinstance(messages[-1], QueueStopEvent)
@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.features.rate_limiting.rate_limit import RateLimit
+from core.errors.error import AppInvokeQuotaExceededError
+
+
+@pytest.fixture
+def redis_client(mocker):
+    client = MagicMock()
+    client.register_script.return_value = MagicMock(return_value=1)
+    mocker.patch("core.app.features.rate_limiting.rate_limit.redis_client", client)
+    mocker.patch.dict(RateLimit._instance_dict, clear=True)
+    return client
+
+
+def test_enter_admits_in_one_script_call(redis_client):
+    rate_limit = RateLimit("app-1", 2)
+    enter_script = redis_client.register_script.return_value
+
+    request_id = rate_limit.enter("request-1")
+
+    assert request_id == "request-1"
+    enter_script.assert_called_once()
+    keys, args = enter_script.call_args.kwargs["keys"], enter_script.call_args.kwargs["args"]
+    assert keys == ["dify:rate_limit:app-1:active_requests_by_time"]
+    assert args[0] == "request-1"
+    assert args[2] == RateLimit._REQUEST_MAX_ALIVE_TIME
+    assert args[3] == 2
+    redis_client.hlen.assert_not_called()
+    redis_client.hset.assert_not_called()
+
+
+def test_enter_over_limit_raises(redis_client):
+    rate_limit = RateLimit("app-1", 1)
+    redis_client.register_script.return_value.return_value = -1
+
+    with pytest.raises(AppInvokeQuotaExceededError):
+        rate_limit.enter("request-1")
+
+
+def test_unlimited_skips_redis(redis_client):
+    rate_limit = RateLimit("app-1", 0)
+
+    request_id = rate_limit.enter()
+    rate_limit.exit(request_id)
+
+    redis_client.register_script.return_value.assert_not_called()
+    redis_client.zrem.assert_not_called()
+
+
+def test_exit_and_occupancy(redis_client):
+    rate_limit = RateLimit("app-1", 2)
+    redis_client.zcount.return_value = 1
+
+    rate_limit.exit("request-1")
+
+    redis_client.zrem.assert_called_once_with("dify:rate_limit:app-1:active_requests_by_time", "request-1")
+    assert rate_limit.get_active_requests_count() == 1
@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+
+
+@patch("httpx.Client.post")
+def test_execute_code_reuses_pooled_client(mock_post):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"code": 0, "message": "success", "data": {"stdout": "hello", "error": None}}
+    mock_post.return_value = response
+
+    client = CodeExecutor.get_http_client()
+    assert CodeExecutor.execute_code(CodeLanguage.PYTHON3, "", "print('hello')") == "hello"
+    assert CodeExecutor.execute_code(CodeLanguage.PYTHON3, "", "print('hello')") == "hello"
+
+    assert CodeExecutor.get_http_client() is client
+    assert mock_post.call_count == 2
+    # waiting for a pooled connection is bounded
+    assert mock_post.call_args.kwargs["timeout"].pool is not None
+
+
+@patch("httpx.Client.post")
+def test_execute_code_service_unavailable(mock_post):
+    response = MagicMock()
+    response.status_code = 503
+    mock_post.return_value = response
+
+    with pytest.raises(CodeExecutionError):
+        CodeExecutor.execute_code(CodeLanguage.PYTHON3, "", "print('hello')")
+
+
+def test_execute_workflow_code_template_batch_preserves_order():
+    def execute(language, code, inputs):
+        return {"result": inputs["x"] * 2}
+
+    with patch.object(CodeExecutor, "execute_workflow_code_template", side_effect=execute) as mock_execute:
+        outputs = CodeExecutor.execute_workflow_code_template_batch(
+            CodeLanguage.PYTHON3, "def main(x): return {'result': x * 2}", [{"x": i} for i in range(20)]
+        )
+
+    assert outputs == [{"result": i * 2} for i in range(20)]
+    assert mock_execute.call_count == 20
+    assert CodeExecutor.execute_workflow_code_template_batch(CodeLanguage.PYTHON3, "", []) == []
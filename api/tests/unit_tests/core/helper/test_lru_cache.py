@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+from core.helper.lru_cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(capacity=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "capacity": 2, "hits": 3, "misses": 1}
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(capacity=2, ttl=10)
+    with patch("core.helper.lru_cache.time.monotonic", return_value=100.0):
+        cache.put("a", 1)
+    with patch("core.helper.lru_cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") == 1
+    with patch("core.helper.lru_cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_cache_zero_capacity_is_disabled():
+    cache = LRUCache(capacity=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
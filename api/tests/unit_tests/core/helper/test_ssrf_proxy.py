@@ -1,8 +1,10 @@
 import random
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 
+from core.helper import ssrf_proxy
 from core.helper.ssrf_proxy import SSRF_DEFAULT_MAX_RETRIES, STATUS_FORCELIST, make_request
 
 
@@ -50,3 +52,52 @@ def test_retry_logic_success(mock_request):
     assert response.status_code == 200
     assert mock_request.call_count == SSRF_DEFAULT_MAX_RETRIES + 1
     assert mock_request.call_args_list[0][1].get("method") == "GET"
+
+
+@patch("httpx.Client.request")
+def test_client_reused_across_requests(mock_request):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_request.return_value = mock_response
+
+    client = ssrf_proxy.get_client()
+    make_request("GET", "http://example.com")
+    make_request("POST", "http://example.com")
+
+    assert ssrf_proxy.get_client() is client
+    assert mock_request.call_count == 2
+
+
+def test_client_does_not_persist_response_cookies():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"Set-Cookie": "session=secret; Path=/"})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler), cookies=ssrf_proxy._no_cookie_jar())
+    client.get("http://example.com")
+    assert not client.cookies
+
+
+@patch("httpx.Client.request")
+def test_pool_stats(mock_request):
+    ssrf_proxy._reset_clients()
+    mock_response_500 = MagicMock()
+    mock_response_500.status_code = 500
+    mock_response_200 = MagicMock()
+    mock_response_200.status_code = 200
+    in_flight = []
+
+    def request(**kwargs):
+        in_flight.append(ssrf_proxy.get_pool_stats()["in_flight"])
+        return mock_response_500 if len(in_flight) == 1 else mock_response_200
+
+    mock_request.side_effect = request
+
+    with patch("time.sleep"):
+        make_request("GET", "http://example.com", max_retries=1)
+
+    assert in_flight == [1, 1]
+    stats = ssrf_proxy.get_pool_stats()
+    assert stats["requests"] == 2
+    assert stats["retries"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["max_connections"] == ssrf_proxy.SSRF_POOL_MAX_CONNECTIONS
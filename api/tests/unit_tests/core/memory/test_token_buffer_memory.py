@@ -0,0 +1,144 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
+from core.memory.message_tokens_cache import message_tokens_cache
+from core.memory.token_buffer_memory import TokenBufferMemory
+from core.model_runtime.entities import AssistantPromptMessage, UserPromptMessage
+from models.model import AppMode
+
+
+def _count_tokens(prompt_messages):
+    # one token per character plus 3 tokens of reply priming per request, like OpenAI models
+    return sum(len(prompt_message.content) for prompt_message in prompt_messages) + 3
+
+
+def _prune_one_by_one(prompt_messages, max_token_limit):
+    prompt_messages = list(prompt_messages)
+    while _count_tokens(prompt_messages) > max_token_limit and len(prompt_messages) > 1:
+        prompt_messages.pop(0)
+    return prompt_messages
+
+
+@pytest.fixture
+def redis_client(mocker):
+    values = {}
+    redis_client = MagicMock()
+    mocker.patch("core.memory.message_tokens_cache.redis_client", redis_client)
+    redis_client.mget.side_effect = lambda keys: [values.get(key) for key in keys]
+    pipe = redis_client.pipeline.return_value.__enter__.return_value
+    pipe.setex.side_effect = lambda key, ttl, value: values.__setitem__(key, str(value).encode())
+    return values
+
+
+@pytest.fixture
+def memory(redis_client):
+    message_tokens_cache.clear()
+    model_instance = MagicMock(provider="openai", model="gpt-4o")
+    model_instance.get_llm_num_tokens.side_effect = _count_tokens
+    return TokenBufferMemory(conversation=MagicMock(), model_instance=model_instance)
+
+
+@pytest.mark.parametrize("max_token_limit", [0, 10, 57, 100, 1000])
+def test_prune_prompt_messages(memory, max_token_limit):
+    prompt_messages = []
+    message_ids = []
+    for i in range(20):
+        prompt_messages.append(UserPromptMessage(content="q" * (i % 7 + 1)))
+        prompt_messages.append(AssistantPromptMessage(content="a" * (i % 5 + 2)))
+        message_ids.extend([f"message_{i}", f"message_{i}"])
+
+    pruned = memory._prune_prompt_messages(prompt_messages, message_ids, max_token_limit)
+
+    assert pruned == _prune_one_by_one(prompt_messages, max_token_limit)
+    # one count of the whole history, then at most one count per message
+    assert memory.model_instance.get_llm_num_tokens.call_count <= len(prompt_messages) + 1
+
+    # counts of messages are cached
+    memory.model_instance.get_llm_num_tokens.reset_mock()
+    assert memory._prune_prompt_messages(prompt_messages, message_ids, max_token_limit) == pruned
+    assert memory.model_instance.get_llm_num_tokens.call_count == 1
+
+
+def test_get_file_extra_configs_resolves_each_workflow_once(mocker, memory):
+    db = mocker.patch("core.memory.token_buffer_memory.db")
+    workflow_runs_query, workflows_query = MagicMock(), MagicMock()
+    db.session.query.side_effect = [workflow_runs_query, workflows_query]
+    workflow_runs_query.filter.return_value.all.return_value = [("run_1", "workflow_1"), ("run_2", "workflow_1")]
+    workflows_query.filter.return_value.all.return_value = [
+        MagicMock(
+            id="workflow_1",
+            features_dict={
+                "file_upload": {"enabled": True, "number_limits": 3, "allowed_file_upload_methods": ["local_file"]}
+            },
+        )
+    ]
+    convert = mocker.spy(FileUploadConfigManager, "convert")
+    memory.conversation.mode = AppMode.ADVANCED_CHAT
+    messages = [
+        MagicMock(id="message_1", workflow_run_id="run_1"),
+        MagicMock(id="message_2", workflow_run_id="run_2"),
+        MagicMock(id="message_3", workflow_run_id=None),
+    ]
+
+    file_extra_configs = memory._get_file_extra_configs(messages)
+
+    assert db.session.query.call_count == 2
+    assert convert.call_count == 1
+    assert file_extra_configs.keys() == {"message_1", "message_2"}
+    assert file_extra_configs["message_1"] is file_extra_configs["message_2"]
+    assert file_extra_configs["message_1"].image_config.number_limits == 3
+
+
+def test_message_tokens_are_shared_through_redis(memory, redis_client):
+    prompt_messages = [UserPromptMessage(content="q" * 10), AssistantPromptMessage(content="a" * 10)] * 3
+    message_ids = ["message_1", "message_1", "message_2", "message_2", "message_3", "message_3"]
+
+    pruned = memory._prune_prompt_messages(prompt_messages, message_ids, 30)
+    assert len(pruned) == 2
+    assert len(redis_client) == len(prompt_messages)
+
+    # another worker without the counts in process memory
+    message_tokens_cache.clear()
+    memory.model_instance.get_llm_num_tokens.reset_mock()
+    assert memory._prune_prompt_messages(prompt_messages, message_ids, 30) == pruned
+    assert memory.model_instance.get_llm_num_tokens.call_count == 1
+
+
+@pytest.mark.parametrize(("answer_tokens", "expected_calls"), [(10, 6), (30, 9)])
+def test_stored_answer_tokens(memory, redis_client, answer_tokens, expected_calls):
+    prompt_messages = [UserPromptMessage(content="q" * 10), AssistantPromptMessage(content="a" * 10)] * 4
+    message_ids = [f"message_{i // 2}" for i in range(8)]
+    stored_tokens = [None, answer_tokens] * 4
+
+    pruned = memory._prune_prompt_messages(prompt_messages, message_ids, 45, stored_tokens)
+
+    assert pruned == _prune_one_by_one(prompt_messages, 45)
+    # matching stored tokens are reused, once checked against counting one answer
+    assert memory.model_instance.get_llm_num_tokens.call_count == expected_calls
+    # only counts are shared, not the estimates
+    assert len(redis_client) == expected_calls - 1
+
+    # the counted answer is the sample of other workers
+    message_tokens_cache.clear()
+    memory.model_instance.get_llm_num_tokens.reset_mock()
+    assert memory._prune_prompt_messages(prompt_messages, message_ids, 45, stored_tokens) == pruned
+    assert memory.model_instance.get_llm_num_tokens.call_count == 1
+
+
+@pytest.mark.parametrize(
+    ("answer", "answer_tokens", "expected"),
+    [
+        ("a" * 100, 25, 25),
+        # the answer was replaced, e.g. by moderation
+        ("a" * 10, 500, None),
+        # a stopped generation
+        ("a" * 1000, 1, None),
+    ],
+)
+def test_get_stored_answer_tokens(memory, answer, answer_tokens, expected):
+    memory.conversation.mode = AppMode.CHAT
+    message = MagicMock(answer=answer, answer_tokens=answer_tokens, model_provider="openai", model_id="gpt-4o")
+
+    assert memory._get_stored_answer_tokens(message) == expected
@@ -0,0 +1,38 @@
+from os.path import dirname, join
+
+import pytest
+from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer
+
+import core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier as gpt2_tokenizer_module
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
+
+TEXTS = [
+    "",
+    "Hello, world!",
+    "  leading spaces and trailing newlines\n\n",
+    "I'm sure they'll say it's 2024, aren't they?",
+    "中文分词测试，日本語のテキスト",
+    "emoji 😀👍 and accents: café naïve",
+    "tabs\tand\r\nline breaks",
+    "<|endoftext|> is a special token",
+    "x" * 1000,
+]
+
+
+@pytest.fixture(scope="module")
+def transformer_tokenizer():
+    return TransformerGPT2Tokenizer.from_pretrained(join(dirname(gpt2_tokenizer_module.__file__), "gpt2"))
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_get_num_tokens_matches_transformers(transformer_tokenizer, text):
+    assert GPT2Tokenizer.get_num_tokens(text) == len(transformer_tokenizer.encode(text, verbose=False))
+
+
+def test_get_num_tokens_batch():
+    assert GPT2Tokenizer.get_num_tokens_batch(TEXTS) == [GPT2Tokenizer.get_num_tokens(text) for text in TEXTS]
+    assert GPT2Tokenizer.get_num_tokens_batch([]) == []
+
+
+def test_get_encoder_is_shared():
+    assert GPT2Tokenizer.get_encoder() is GPT2Tokenizer.get_encoder()
@@ -0,0 +1,44 @@
+from core.moderation.keywords.keywords import KeywordsMatcher, KeywordsModeration, get_keywords_matcher
+
+CONFIG = {
+    "inputs_config": {"enabled": True, "preset_response": "input blocked"},
+    "outputs_config": {"enabled": True, "preset_response": "output blocked"},
+    "keywords": "Bad Word\n\n敏感词",
+}
+
+
+def test_matcher_search():
+    matcher = KeywordsMatcher(["Bad Word", "", "敏感词", "bad word"])
+
+    assert matcher.keywords == ("bad word", "敏感词")
+    assert matcher.search("this is a BAD WORD")
+    assert matcher.search("包含敏感词的文本")
+    assert not matcher.search("this is fine")
+
+
+def test_matcher_search_appended_text():
+    matcher = KeywordsMatcher(["bad word"])
+
+    # the keyword spans the checked text and the appended text
+    assert matcher.search("this is a bad word", start=len("this is a bad"))
+    # the keyword is entirely in the checked text
+    assert not matcher.search("bad word and more text", start=len("bad word and more"))
+
+
+def test_get_keywords_matcher_is_cached():
+    assert get_keywords_matcher(CONFIG["keywords"]) is get_keywords_matcher(CONFIG["keywords"])
+
+
+def test_moderation():
+    moderation = KeywordsModeration(app_id="app", tenant_id="tenant", config=CONFIG)
+
+    inputs_result = moderation.moderation_for_inputs({"text": "hello"}, query="some bad word")
+    assert inputs_result.flagged
+    assert inputs_result.preset_response == "input blocked"
+
+    outputs_result = moderation.moderation_for_outputs("fine")
+    assert not outputs_result.flagged
+
+    outputs_result = moderation.moderation_for_appended_outputs("fine, 敏感词", len("fine, 敏"))
+    assert outputs_result.flagged
+    assert outputs_result.preset_response == "output blocked"
@@ -0,0 +1,71 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from configs import dify_config
+from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.moderation.base import ModerationAction, ModerationOutputsResult
+from core.moderation.output_moderation import ModerationRule, OutputModeration
+
+
+def _wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _output_moderation() -> OutputModeration:
+    return OutputModeration(
+        tenant_id="tenant",
+        app_id="app",
+        rule=ModerationRule(type="keywords", config={}),
+        queue_manager=MagicMock(spec=AppQueueManager),
+    )
+
+
+def test_moderates_once_buffer_size_reached(mocker):
+    output_moderation = _output_moderation()
+    calls = []
+    moderated = threading.Event()
+
+    def moderation(tenant_id, app_id, moderation_buffer, checked_length=0):
+        calls.append((len(moderation_buffer), checked_length))
+        moderated.set()
+        return ModerationOutputsResult(flagged=False, action=ModerationAction.DIRECT_OUTPUT)
+
+    mocker.patch.object(OutputModeration, "moderation", side_effect=moderation)
+
+    buffer_size = dify_config.MODERATION_BUFFER_SIZE
+    output_moderation.append_new_token("a" * (buffer_size - 1))
+    assert not moderated.wait(0.1)
+
+    output_moderation.append_new_token("a")
+    assert moderated.wait(5)
+    _wait_for(lambda: not output_moderation._checking)
+    assert calls == [(buffer_size, 0)]
+
+    moderated.clear()
+    output_moderation.append_new_token("a" * buffer_size)
+    assert moderated.wait(5)
+    _wait_for(lambda: not output_moderation._checking)
+    # only the text appended after the last moderation is new
+    assert calls[-1] == (2 * buffer_size, buffer_size)
+
+
+def test_flagged_direct_output(mocker):
+    output_moderation = _output_moderation()
+    mocker.patch.object(
+        OutputModeration,
+        "moderation",
+        return_value=ModerationOutputsResult(
+            flagged=True, action=ModerationAction.DIRECT_OUTPUT, preset_response="blocked"
+        ),
+    )
+
+    output_moderation.append_new_token("a" * dify_config.MODERATION_BUFFER_SIZE)
+
+    _wait_for(output_moderation.should_direct_output)
+    assert output_moderation.get_final_output() == "blocked"
+    output_moderation.queue_manager.publish.assert_called_once()
+    assert not output_moderation.thread_running
@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+from core.rag.datasource.keyword.jieba import jieba
+from core.rag.datasource.keyword.jieba.jieba import Jieba
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+
+def _jieba(mocker) -> Jieba:
+    jieba.keyword_table_cache.clear()
+    mocker.patch.object(jieba, "redis_client", FakeRedis())
+    dataset = MagicMock()
+    dataset.id = "dataset_id"
+    return Jieba(dataset)
+
+
+def test_cached_keyword_table_reused_until_version_changes(mocker):
+    keyword = _jieba(mocker)
+    load = mocker.patch.object(Jieba, "_get_dataset_keyword_table", return_value={"dify": {"node-1"}})
+
+    assert keyword._get_cached_dataset_keyword_table() == {"dify": {"node-1"}}
+    assert keyword._get_cached_dataset_keyword_table() == {"dify": {"node-1"}}
+    assert load.call_count == 1
+
+    keyword._bump_keyword_table_version()
+    load.return_value = {"dify": {"node-1", "node-2"}}
+    assert keyword._get_cached_dataset_keyword_table() == {"dify": {"node-1", "node-2"}}
+    assert load.call_count == 2
+
+
+def test_text_exists_uses_cached_keyword_table(mocker):
+    keyword = _jieba(mocker)
+    load = mocker.patch.object(Jieba, "_get_dataset_keyword_table", return_value={"dify": {"node-1"}})
+
+    assert keyword.text_exists("node-1")
+    assert not keyword.text_exists("node-2")
+    assert load.call_count == 1
+
+
+def _segment(index_node_id: str) -> MagicMock:
+    segment = MagicMock()
+    segment.index_node_id = index_node_id
+    segment.content = f"content of {index_node_id}"
+    segment.dataset_id = "dataset_id"
+    return segment
+
+
+def test_documents_fetched_in_one_query_preserving_rank(mocker):
+    keyword = _jieba(mocker)
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.return_value = [_segment("node-1"), _segment("node-3")]
+    mocker.patch.object(jieba.db, "session", session)
+
+    documents = keyword._get_documents_by_chunk_indices(["node-3", "node-2", "node-1"])
+
+    assert session.query.call_count == 1
+    assert [document.metadata["doc_id"] for document in documents] == ["node-3", "node-1"]
+
+
+def test_segment_keywords_updated_with_single_commit(mocker):
+    keyword = _jieba(mocker)
+    segments = [_segment("node-1"), _segment("node-2")]
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.return_value = segments
+    mocker.patch.object(jieba.db, "session", session)
+
+    keyword._update_segments_keywords("dataset_id", {"node-1": ["a"], "node-2": ["b", "c"]})
+
+    assert session.query.call_count == 1
+    session.commit.assert_called_once()
+    assert segments[0].keywords == ["a"]
+    assert segments[1].keywords == ["b", "c"]
@@ -0,0 +1,28 @@
+from core.rag.datasource.keyword.jieba import jieba_keyword_table_handler
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.models.document import Document
+
+
+def test_extract_document_keywords_extracts_all_keywords(mocker):
+    jieba_keyword_table_handler.document_keywords_cache.clear()
+    handler = JiebaKeywordTableHandler()
+    extract = mocker.spy(handler, "extract_keywords")
+    # keywords stored on the segment are limited to max_keywords_per_chunk, they are not used for scoring
+    document = Document(page_content="Dify is an LLM app platform", metadata={"keywords": ["dify"]})
+
+    assert handler.extract_document_keywords(document) == handler.extract_keywords(document.page_content, None)
+    assert extract.call_args_list[0].args == (document.page_content, None)
+
+
+def test_extract_document_keywords_cached_by_hash(mocker):
+    jieba_keyword_table_handler.document_keywords_cache.clear()
+    handler = JiebaKeywordTableHandler()
+    extract = mocker.spy(handler, "extract_keywords")
+    document = Document(page_content="Dify workflow orchestration", metadata={"doc_hash": "hash-1"})
+
+    first = handler.extract_document_keywords(document)
+    second = handler.extract_document_keywords(Document(page_content="ignored", metadata={"doc_hash": "hash-1"}))
+
+    assert first == second
+    assert "workflow" in first
+    assert extract.call_count == 1
@@ -0,0 +1,127 @@
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from core.rag.datasource.keyword.jieba import jieba_postings
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.jieba.jieba_postings import JiebaPostings
+from core.rag.models.document import Document
+
+
+def _postings(mocker) -> tuple[JiebaPostings, MagicMock]:
+    session = MagicMock()
+    mocker.patch.object(jieba_postings.db, "session", session)
+    dataset = MagicMock()
+    dataset.id = "dataset_id"
+    return JiebaPostings(dataset), session
+
+
+def _inserted_rows(session: MagicMock) -> set[tuple[str, str, str]]:
+    rows = set()
+    for execute_call in session.execute.call_args_list:
+        params = execute_call.args[0].compile(dialect=postgresql.dialect()).params
+        for key, keyword in params.items():
+            if key.startswith("keyword_m"):
+                index = key.removeprefix("keyword_m")
+                rows.add((params[f"dataset_id_m{index}"], keyword, params[f"index_node_id_m{index}"]))
+    return rows
+
+
+def _document(doc_id: str, content: str) -> Document:
+    return Document(page_content=content, metadata={"doc_id": doc_id})
+
+
+def test_add_texts_inserts_one_posting_per_keyword(mocker):
+    keyword, session = _postings(mocker)
+    mocker.patch.object(JiebaKeywordTableHandler, "extract_keywords", return_value={"dify", "rag"})
+    update_segments = mocker.patch.object(JiebaPostings, "_update_segments_keywords")
+
+    keyword.add_texts(
+        [_document("node-1", "dify rag"), _document("node-2", "given keywords")],
+        keywords_list=[None, ["given", "given"]],
+    )
+
+    update_segments.assert_called_once()
+    assert update_segments.call_args.args[1]["node-2"] == ["given", "given"]
+    assert _inserted_rows(session) == {
+        ("dataset_id", "dify", "node-1"),
+        ("dataset_id", "rag", "node-1"),
+        ("dataset_id", "given", "node-2"),
+    }
+    session.commit.assert_called_once()
+
+
+def test_create_adds_texts(mocker):
+    keyword, session = _postings(mocker)
+    mocker.patch.object(JiebaKeywordTableHandler, "extract_keywords", return_value={"dify"})
+    mocker.patch.object(JiebaPostings, "_update_segments_keywords")
+
+    assert keyword.create([_document("node-1", "dify")]) is keyword
+    assert _inserted_rows(session) == {("dataset_id", "dify", "node-1")}
+
+
+def test_add_postings_batches_inserts(mocker):
+    keyword, session = _postings(mocker)
+    mocker.patch.object(jieba_postings, "POSTINGS_BATCH_SIZE", 2)
+
+    keyword._add_postings({"node-1": ["a", "b"], "node-2": ["c"]})
+
+    assert session.execute.call_count == 2
+    assert len(_inserted_rows(session)) == 3
+    session.commit.assert_called_once()
+
+
+def test_search_returns_documents_in_order_of_matches(mocker):
+    keyword, session = _postings(mocker)
+    mocker.patch.object(JiebaKeywordTableHandler, "extract_keywords", return_value={"dify", "rag"})
+    get_documents = mocker.patch.object(JiebaPostings, "_get_documents_by_chunk_indices", return_value=["documents"])
+    query = session.query.return_value.filter.return_value.group_by.return_value.order_by.return_value
+    query.limit.return_value.all.return_value = [
+        MagicMock(index_node_id="node-2"),
+        MagicMock(index_node_id="node-1"),
+    ]
+
+    assert keyword.search("dify rag", top_k=2) == ["documents"]
+    query.limit.assert_called_once_with(2)
+    get_documents.assert_called_once_with(["node-2", "node-1"])
+
+
+def test_search_without_keywords(mocker):
+    keyword, session = _postings(mocker)
+    mocker.patch.object(JiebaKeywordTableHandler, "extract_keywords", return_value=set())
+
+    assert keyword.search("the") == []
+    session.query.assert_not_called()
+
+
+def test_delete_by_ids_batches_deletes(mocker):
+    keyword, session = _postings(mocker)
+    mocker.patch.object(jieba_postings, "POSTINGS_BATCH_SIZE", 2)
+
+    keyword.delete_by_ids(["node-1", "node-2", "node-3"])
+
+    assert session.query.return_value.filter.return_value.delete.call_count == 2
+    session.commit.assert_called_once()
+
+
+def test_delete_removes_dataset_postings(mocker):
+    keyword, session = _postings(mocker)
+
+    keyword.delete()
+
+    session.query.return_value.filter.return_value.delete.assert_called_once_with(synchronize_session=False)
+    session.commit.assert_called_once()
+
+
+def test_update_segment_keywords_index_replaces_old_postings(mocker):
+    keyword, session = _postings(mocker)
+
+    keyword.update_segment_keywords_index("node-1", ["new"])
+
+    delete = session.query.return_value.filter.return_value.delete
+    delete.assert_called_once_with(synchronize_session=False)
+    assert _inserted_rows(session) == {("dataset_id", "new", "node-1")}
+    # the old postings are deleted before the new ones are inserted, in one transaction
+    names = [name for name, _, _ in session.mock_calls]
+    assert names.index("query().filter().delete") < names.index("execute") < names.index("commit")
+    session.commit.assert_called_once()
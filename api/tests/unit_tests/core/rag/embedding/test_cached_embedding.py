@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from core.rag.embedding import cached_embedding
+from core.rag.embedding.cached_embedding import CacheEmbedding
+from libs import helper
+from models.dataset import Embedding
+
+
+def _mock_model_instance(dimension: int = 4) -> MagicMock:
+    model_instance = MagicMock()
+    model_instance.model = "text-embedding-3-small"
+    model_instance.provider = "openai"
+    model_instance.model_type_instance.get_model_schema.return_value = None
+
+    def invoke_text_embedding(texts, user=None, input_type=None):
+        result = MagicMock()
+        result.embeddings = [[float(len(text))] * dimension for text in texts]
+        return result
+
+    model_instance.invoke_text_embedding.side_effect = invoke_text_embedding
+    return model_instance
+
+
+def test_embed_documents_uses_single_bulk_lookup(mocker):
+    cached_text = "cached"
+    cached = Embedding(model_name="text-embedding-3-small", hash=helper.generate_text_hash(cached_text))
+    cached.set_embedding([1.0, 0.0, 0.0, 0.0])
+
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.return_value = [cached]
+    mocker.patch.object(cached_embedding.db, "session", session)
+
+    model_instance = _mock_model_instance()
+    texts = [cached_text, "a", "bb", "a"]
+    embeddings = CacheEmbedding(model_instance).embed_documents(texts)
+
+    # one IN query for all texts, one bulk insert for the distinct misses
+    assert session.query.call_count == 1
+    assert session.execute.call_count == 1
+    session.commit.assert_called_once()
+
+    assert embeddings[0] == [1.0, 0.0, 0.0, 0.0]
+    assert embeddings[1] == embeddings[3]
+    assert np.isclose(np.linalg.norm(embeddings[2]), 1.0)
+    assert model_instance.invoke_text_embedding.call_count == 3
+
+
+def test_embed_documents_all_cached_skips_model(mocker):
+    texts = ["x", "y"]
+    rows = []
+    for text in texts:
+        row = Embedding(model_name="text-embedding-3-small", hash=helper.generate_text_hash(text))
+        row.set_embedding([0.5, 0.5])
+        rows.append(row)
+
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.return_value = rows
+    mocker.patch.object(cached_embedding.db, "session", session)
+
+    model_instance = _mock_model_instance()
+    embeddings = CacheEmbedding(model_instance).embed_documents(texts)
+
+    assert embeddings == [[0.5, 0.5], [0.5, 0.5]]
+    model_instance.invoke_text_embedding.assert_not_called()
+    session.execute.assert_not_called()
+
+
+def test_embed_query_served_from_local_cache(mocker):
+    cached_embedding.query_embedding_cache.clear()
+    redis_get = mocker.patch.object(cached_embedding.redis_client, "get", return_value=None)
+    mocker.patch.object(cached_embedding.redis_client, "setex")
+
+    model_instance = _mock_model_instance()
+    # values not representable in float32
+    model_instance.invoke_text_embedding.side_effect = lambda **kwargs: MagicMock(embeddings=[[0.1, 0.2, 0.3]])
+    cache_embedding = CacheEmbedding(model_instance)
+    first = cache_embedding.embed_query("what is dify")
+    second = cache_embedding.embed_query("what is dify")
+
+    # the local cache returns the same values as the model and redis
+    assert first == second
+    assert model_instance.invoke_text_embedding.call_count == 1
+    assert redis_get.call_count == 1
+    assert cached_embedding.query_embedding_cache.stats()["hits"] == 1
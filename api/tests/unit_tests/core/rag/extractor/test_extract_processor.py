@@ -0,0 +1,91 @@
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.rag.extractor import extract_cache
+from core.rag.extractor.entity.extract_setting import ExtractSetting
+from core.rag.extractor.extract_cache import ExtractCache
+from core.rag.extractor.extract_processor import ExtractProcessor
+
+
+@pytest.fixture
+def storage(mocker):
+    files: dict[str, bytes] = {}
+
+    storage = MagicMock()
+    storage.exists.side_effect = lambda key: key in files
+    storage.load_once.side_effect = lambda key: files[key]
+    storage.save.side_effect = lambda key, data: files.__setitem__(key, data)
+    storage.delete.side_effect = lambda key: files.pop(key)
+    storage.download.side_effect = lambda key, target: Path(target).write_bytes(files[key])
+    mocker.patch("core.rag.extractor.extract_cache.storage", storage)
+    mocker.patch("core.rag.extractor.extract_processor.storage", storage)
+    mocker.patch.object(
+        extract_cache,
+        "dify_config",
+        SimpleNamespace(EXTRACT_CACHE_ENABLED=True, EXTRACT_CACHE_MIN_FILE_SIZE=5, EXTRACT_CACHE_MAX_CONTENT_LENGTH=20),
+    )
+    # text files are cheap to extract, cache them to keep the test file simple
+    mocker.patch.object(ExtractCache, "CACHEABLE_FILE_EXTENSIONS", frozenset({".txt"}))
+
+    storage.files = files
+    files["upload_files/tenant/file.txt"] = b"hello world"
+    return storage
+
+
+def _extract_setting(upload_file) -> ExtractSetting:
+    return ExtractSetting.model_construct(
+        datasource_type="upload_file", upload_file=upload_file, document_model="text_model"
+    )
+
+
+def test_extract_upload_file_is_cached(storage):
+    upload_file = MagicMock(key="upload_files/tenant/file.txt", tenant_id="tenant", hash="abc", size=11)
+    extract_setting = _extract_setting(upload_file)
+
+    documents = ExtractProcessor.extract(extract_setting)
+    assert [document.page_content for document in documents] == ["hello world"]
+    assert storage.download.call_count == 1
+    assert storage.save.call_count == 1
+
+    cached_documents = ExtractProcessor.extract(extract_setting)
+    assert [document.page_content for document in cached_documents] == ["hello world"]
+    assert storage.save.call_count == 1
+    # the upload is not even downloaded again
+    assert storage.download.call_count == 1
+
+    # the entries are deleted with the upload file
+    ExtractCache.delete_upload_file_entries(upload_file)
+    assert list(storage.files) == ["upload_files/tenant/file.txt"]
+
+
+@pytest.mark.parametrize(
+    ("key", "content_hash", "size"),
+    [
+        # without a hash the entries could not be deleted with the upload file
+        ("upload_files/tenant/file.txt", None, 11),
+        # below the size threshold
+        ("upload_files/tenant/file.txt", "abc", 4),
+        # cheap extractor
+        ("upload_files/tenant/file.csv", "abc", 11),
+    ],
+)
+def test_extract_upload_file_is_not_cached(storage, key, content_hash, size):
+    storage.files[key] = b"hello world"
+    upload_file = MagicMock(key=key, tenant_id="tenant", hash=content_hash, size=size)
+
+    ExtractProcessor.extract(_extract_setting(upload_file))
+
+    storage.save.assert_not_called()
+
+
+def test_extract_upload_file_too_large_to_cache(storage):
+    storage.files["upload_files/tenant/file.txt"] = b"hello world" * 2
+    upload_file = MagicMock(key="upload_files/tenant/file.txt", tenant_id="tenant", hash="abc", size=22)
+
+    documents = ExtractProcessor.extract(_extract_setting(upload_file))
+
+    assert [document.page_content for document in documents] == ["hello world" * 2]
+    storage.save.assert_not_called()
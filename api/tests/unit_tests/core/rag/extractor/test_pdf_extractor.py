@@ -0,0 +1,54 @@
+import ctypes
+from types import SimpleNamespace
+
+import pypdfium2
+import pypdfium2.raw as pdfium_c
+import pytest
+
+from core.rag.extractor import pdf_extractor
+from core.rag.extractor.pdf_extractor import PdfExtractor
+
+
+def _make_pdf(path: str, texts: list[str]) -> None:
+    pdf = pypdfium2.PdfDocument.new()
+    for text in texts:
+        page = pdf.new_page(200, 200)
+        text_obj = pdfium_c.FPDFPageObj_NewTextObj(pdf.raw, b"Helvetica", ctypes.c_float(12))
+        buffer = ctypes.create_string_buffer((text + "\x00").encode("utf-16-le"))
+        pdfium_c.FPDFText_SetText(text_obj, ctypes.cast(buffer, ctypes.POINTER(pdfium_c.FPDF_WCHAR)))
+        pdfium_c.FPDFPageObj_Transform(text_obj, 1, 0, 0, 1, 10, 100)
+        pdfium_c.FPDFPage_InsertObject(page.raw, text_obj)
+        pdfium_c.FPDFPage_GenerateContent(page.raw)
+        page.close()
+    pdf.save(path)
+    pdf.close()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = str(tmp_path / "test.pdf")
+    _make_pdf(path, [f"page {i}" for i in range(7)])
+    return path
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_extract_pages_in_order(mocker, pdf_path, max_workers):
+    mocker.patch.object(
+        pdf_extractor,
+        "dify_config",
+        SimpleNamespace(
+            PDF_EXTRACT_MAX_WORKERS=max_workers, PDF_EXTRACT_PARALLEL_MIN_PAGES=3, PDF_EXTRACT_PAGES_PER_TASK=2
+        ),
+    )
+    parse_in_parallel = mocker.spy(PdfExtractor, "_parse_in_parallel")
+
+    try:
+        documents = list(PdfExtractor(pdf_path).extract_iter())
+    finally:
+        if pdf_extractor._executor:
+            pdf_extractor._executor.shutdown()
+            pdf_extractor._reset_executor()
+
+    assert [document.page_content for document in documents] == [f"page {i}" for i in range(7)]
+    assert [document.metadata["page"] for document in documents] == list(range(7))
+    assert parse_in_parallel.call_count == (1 if max_workers else 0)
@@ -0,0 +1,61 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from core.rag.rerank.scoring import calculate_keyword_scores, calculate_vector_scores
+
+
+def _reference_keyword_scores(query_keywords, documents_keywords):
+    total_documents = len(documents_keywords)
+    all_keywords = set()
+    for document_keywords in documents_keywords:
+        all_keywords.update(document_keywords)
+    keyword_idf = {
+        keyword: math.log((1 + total_documents) / (1 + sum(1 for doc in documents_keywords if keyword in doc))) + 1
+        for keyword in all_keywords
+    }
+    query_tfidf = {k: c * keyword_idf.get(k, 0) for k, c in Counter(query_keywords).items()}
+    scores = []
+    for document_keywords in documents_keywords:
+        document_tfidf = {k: c * keyword_idf.get(k, 0) for k, c in Counter(document_keywords).items()}
+        numerator = sum(query_tfidf[k] * document_tfidf[k] for k in set(query_tfidf) & set(document_tfidf))
+        denominator = math.sqrt(sum(v**2 for v in query_tfidf.values())) * math.sqrt(
+            sum(v**2 for v in document_tfidf.values())
+        )
+        scores.append(numerator / denominator if denominator else 0.0)
+    return scores
+
+
+def test_keyword_scores_match_reference():
+    query_keywords = {"dify", "workflow", "unknown"}
+    documents_keywords = [
+        {"dify", "workflow", "llm"},
+        {"dify", "agent"},
+        {"rag", "retrieval"},
+        set(),
+        ["workflow", "workflow", "node"],
+    ]
+
+    scores = calculate_keyword_scores(query_keywords, documents_keywords)
+
+    assert scores == pytest.approx(_reference_keyword_scores(query_keywords, documents_keywords))
+    assert scores[2] == 0.0
+    assert scores[3] == 0.0
+
+
+def test_keyword_scores_empty_inputs():
+    assert calculate_keyword_scores({"dify"}, []) == []
+    assert calculate_keyword_scores({"dify"}, [set(), set()]) == [0.0, 0.0]
+    assert calculate_keyword_scores(set(), [{"dify"}]) == [0.0]
+
+
+def test_vector_scores():
+    query_vector = [1.0, 0.0, 1.0]
+    document_vectors = [[1.0, 0.0, 1.0], [0.0, 1.0, 0.0], [2.0, 0.0, 0.0], [0.0, 0.0, 0.0]]
+
+    scores = calculate_vector_scores(query_vector, document_vectors)
+
+    assert scores == pytest.approx([1.0, 0.0, 1 / np.sqrt(2), 0.0])
+    assert calculate_vector_scores(query_vector, []) == []
@@ -0,0 +1,105 @@
+import threading
+from collections import defaultdict
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.indexing_runner import IndexingRunner
+from core.model_runtime.entities.model_entities import ModelPropertyKey
+from core.rag.models.document import Document
+from models.dataset import Document as DatasetDocument
+
+
+def _documents(count: int) -> list[Document]:
+    return [Document(page_content=f"text {i}", metadata={"doc_id": f"doc_{i}"}) for i in range(count)]
+
+
+@pytest.mark.parametrize(
+    ("max_chunks", "expected_sizes"),
+    [
+        (1, [10, 10, 5]),
+        (4, [12, 12, 1]),
+        (32, [10, 10, 5]),
+    ],
+)
+def test_pack_chunks(max_chunks, expected_sizes):
+    chunks = IndexingRunner._pack_chunks(_documents(25), max_chunks)
+
+    assert [len(chunk) for chunk in chunks] == expected_sizes
+    assert [document for chunk in chunks for document in chunk] == _documents(25)
+
+
+@pytest.mark.parametrize(
+    ("max_chunks", "expected_chunk_size"),
+    [
+        (1, 250),
+        (16, 256),
+        (2048, 250),
+    ],
+)
+def test_pack_chunks_gives_each_worker_several_chunks(max_chunks, expected_chunk_size):
+    chunks = IndexingRunner._pack_chunks(_documents(10000), max_chunks)
+
+    assert len(chunks[0]) == expected_chunk_size
+    assert len(chunks) >= IndexingRunner.LOAD_MAX_WORKERS * IndexingRunner.LOAD_CHUNKS_PER_WORKER - 1
+
+
+@pytest.mark.parametrize(
+    ("model_properties", "expected_max_chunks"),
+    [
+        ({ModelPropertyKey.MAX_CHUNKS: 32, ModelPropertyKey.CONTEXT_SIZE: 8191}, 32),
+        ({ModelPropertyKey.CONTEXT_SIZE: 8191}, 1),
+    ],
+)
+def test_get_embedding_max_chunks(model_properties, expected_max_chunks):
+    embedding_model_instance = MagicMock()
+    model_type_instance = embedding_model_instance.model_type_instance
+    model_type_instance.get_model_schema.return_value = MagicMock(model_properties=model_properties)
+
+    assert IndexingRunner._get_embedding_max_chunks(embedding_model_instance) == expected_max_chunks
+    model_type_instance.get_model_schema.assert_called_once_with(
+        embedding_model_instance.model, embedding_model_instance.credentials
+    )
+
+
+def test_get_embedding_max_chunks_without_model():
+    assert IndexingRunner._get_embedding_max_chunks(None) == 1
+
+
+def test_load_uses_a_vector_per_worker_and_coalesces_segment_updates(mocker):
+    vector_cls = mocker.patch("core.indexing_runner.Vector", side_effect=lambda dataset: MagicMock())
+    mocker.patch.object(IndexingRunner, "_process_keyword_index")
+    mocker.patch.object(IndexingRunner, "_check_document_paused_status")
+    mocker.patch.object(IndexingRunner, "_update_document_index_status")
+    mocker.patch.object(IndexingRunner, "_get_embedding_max_chunks", return_value=1)
+    complete_segments = mocker.patch.object(IndexingRunner, "_complete_segments")
+    mocker.patch.object(IndexingRunner, "SEGMENT_STATUS_UPDATE_BATCH_SIZE", 40)
+
+    runner = IndexingRunner()
+    runner.model_manager = MagicMock()
+    embedding_model_instance = runner.model_manager.get_model_instance.return_value
+    embedding_model_instance.get_text_embedding_num_tokens.side_effect = lambda texts: len(texts)
+    index_processor = MagicMock()
+    thread_vectors = defaultdict(set)
+    index_processor.load.side_effect = lambda *args, vector, **kwargs: thread_vectors[threading.get_ident()].add(
+        id(vector)
+    )
+    dataset = MagicMock(indexing_technique="high_quality")
+    documents = _documents(95)
+
+    runner._load(index_processor=index_processor, dataset=dataset, dataset_document=MagicMock(), documents=documents)
+
+    # each worker thread creates one vector and reuses it for all its chunks
+    assert index_processor.load.call_count == 10
+    assert vector_cls.call_count == len(thread_vectors) <= IndexingRunner.LOAD_MAX_WORKERS
+    assert all(len(vectors) == 1 for vectors in thread_vectors.values())
+
+    # tokens are counted once per chunk
+    assert embedding_model_instance.get_text_embedding_num_tokens.call_count == 10
+    extra_update_params = runner._update_document_index_status.call_args.kwargs["extra_update_params"]
+    assert extra_update_params[DatasetDocument.tokens] == 95
+
+    # segments are completed in batches of at least SEGMENT_STATUS_UPDATE_BATCH_SIZE, plus the rest
+    completed_ids = [doc_id for call in complete_segments.call_args_list for doc_id in call.args[2]]
+    assert sorted(completed_ids) == sorted(document.metadata["doc_id"] for document in documents)
+    assert complete_segments.call_count == 3
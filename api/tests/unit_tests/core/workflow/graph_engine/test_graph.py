@@ -789,3 +789,30 @@ def test_parallels_graph6():
 
     for node_id in ["code1", "code2"]:
         assert graph.node_parallel_mapping[node_id] == child_parallel.id
+
+
+def test_init_with_cache_key():
+    graph_config = {
+        "edges": [
+            {
+                "id": "start-source-answer-target",
+                "source": "start",
+                "target": "answer",
+            },
+        ],
+        "nodes": [
+            {"data": {"type": "start"}, "id": "start"},
+            {"data": {"type": "answer", "title": "answer", "answer": "1"}, "id": "answer"},
+        ],
+    }
+
+    graph = Graph.init(graph_config=graph_config, cache_key="test-graph-cache-key")
+    assert graph.cache_key == "test-graph-cache-key"
+    assert Graph.init(graph_config=graph_config, cache_key="test-graph-cache-key") is graph
+
+    # different key or no key compiles the graph again
+    assert Graph.init(graph_config=graph_config, cache_key="test-graph-cache-key-2") is not graph
+    uncached_graph = Graph.init(graph_config=graph_config)
+    assert uncached_graph is not graph
+    assert uncached_graph.cache_key is None
+    assert uncached_graph.node_ids == graph.node_ids
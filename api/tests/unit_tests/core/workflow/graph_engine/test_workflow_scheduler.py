@@ -0,0 +1,124 @@
+import threading
+
+from core.workflow.graph_engine.workflow_scheduler import WorkflowScheduler
+
+
+def _blocking_task(started: threading.Event, release: threading.Event):
+    started.set()
+    release.wait(5)
+    return threading.current_thread().name
+
+
+def test_submit_runs_in_pool():
+    scheduler = WorkflowScheduler(max_workers=2, max_workers_per_tenant=2, max_workers_per_app=2)
+
+    future = scheduler.submit(lambda: threading.current_thread().name, tenant_id="t1", app_id="a1")
+
+    assert future.result(timeout=5).startswith("workflow")
+
+
+def test_submit_over_app_quota_is_queued():
+    scheduler = WorkflowScheduler(max_workers=4, max_workers_per_tenant=4, max_workers_per_app=1)
+    started, release = threading.Event(), threading.Event()
+
+    blocking_future = scheduler.submit(_blocking_task, started, release, tenant_id="t1", app_id="a1")
+    assert started.wait(5)
+
+    # the app is at its quota, the task waits in the queue without blocking the submitter
+    future = scheduler.submit(lambda: threading.current_thread().name, tenant_id="t1", app_id="a1")
+    assert not future.done()
+
+    # another app of the tenant is not held up by the queued task
+    other_future = scheduler.submit(lambda: threading.current_thread().name, tenant_id="t1", app_id="a2")
+    assert other_future.result(timeout=5).startswith("workflow")
+    assert not future.done()
+
+    # the queued task starts on a worker as soon as the running task of its app finishes
+    release.set()
+    blocking_future.result(timeout=5)
+    assert future.result(timeout=5).startswith("workflow")
+
+
+def test_nested_submit_runs_inline_when_full():
+    scheduler = WorkflowScheduler(max_workers=1, max_workers_per_tenant=1, max_workers_per_app=1)
+
+    def parent():
+        # the parent holds the only slot and waits for its child
+        child = scheduler.submit(lambda: threading.current_thread().name, tenant_id="t1", app_id="a1")
+        return threading.current_thread().name, child.result(timeout=5)
+
+    parent_thread, child_thread = scheduler.submit(parent, tenant_id="t1", app_id="a1").result(timeout=5)
+    assert child_thread == parent_thread
+    assert scheduler.stats()["inline"] == 1
+
+
+def test_nested_submit_counts_against_quota():
+    scheduler = WorkflowScheduler(max_workers=4, max_workers_per_tenant=4, max_workers_per_app=2)
+    started, release = threading.Event(), threading.Event()
+
+    def parent():
+        child = scheduler.submit(_blocking_task, started, release, tenant_id="t1", app_id="a1")
+        assert started.wait(5)
+        # the child runs on the pool and holds a slot of the app
+        stats = scheduler.stats()
+        release.set()
+        return threading.current_thread().name, child.result(timeout=5), stats
+
+    parent_thread, child_thread, stats = scheduler.submit(parent, tenant_id="t1", app_id="a1").result(timeout=5)
+    assert child_thread != parent_thread
+    assert child_thread.startswith("workflow")
+    assert stats["running"] == 2
+    assert stats["inline"] == 0
+
+
+def test_stats():
+    scheduler = WorkflowScheduler(max_workers=2, max_workers_per_tenant=2, max_workers_per_app=1)
+    started, release = threading.Event(), threading.Event()
+
+    blocking_future = scheduler.submit(_blocking_task, started, release, tenant_id="t1", app_id="a1")
+    assert started.wait(5)
+    queued_future = scheduler.submit(lambda: 1, tenant_id="t1", app_id="a1")
+
+    assert scheduler.stats() == {
+        "max_workers": 2,
+        "running": 1,
+        "pending": 1,
+        "tenants": 1,
+        "apps": 1,
+        "submitted": 2,
+        "inline": 0,
+    }
+
+    release.set()
+    blocking_future.result(timeout=5)
+    queued_future.result(timeout=5)
+    stats = scheduler.stats()
+    assert stats["pending"] == 0
+    assert stats["submitted"] == 2
+
+
+def test_cancelled_task_is_not_run():
+    scheduler = WorkflowScheduler(max_workers=1, max_workers_per_tenant=1, max_workers_per_app=1)
+    started, release = threading.Event(), threading.Event()
+    ran = threading.Event()
+
+    blocking_future = scheduler.submit(_blocking_task, started, release, tenant_id="t1", app_id="a1")
+    assert started.wait(5)
+    future = scheduler.submit(ran.set, tenant_id="t1", app_id="a1")
+    assert future.cancel()
+
+    release.set()
+    blocking_future.result(timeout=5)
+    # the slot is freed for the next task
+    assert scheduler.submit(lambda: 1, tenant_id="t1", app_id="a1").result(timeout=5) == 1
+    assert not ran.is_set()
+
+
+def test_exception_is_set_on_future():
+    scheduler = WorkflowScheduler(max_workers=1, max_workers_per_tenant=1, max_workers_per_app=1)
+
+    def fail():
+        raise ValueError("failed")
+
+    future = scheduler.submit(fail, tenant_id="t1", app_id="a1")
+    assert isinstance(future.exception(timeout=5), ValueError)
@@ -1,14 +1,18 @@
+import queue
+import threading
 import time
 import uuid
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.workflow.entities.node_entities import NodeRunResult
 from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.enums import SystemVariableKey
+from core.workflow.graph_engine.entities.event import IterationRunFailedEvent, IterationRunNextEvent
 from core.workflow.graph_engine.entities.graph import Graph
 from core.workflow.graph_engine.entities.graph_init_params import GraphInitParams
 from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
+from core.workflow.graph_engine.graph_engine import GraphEngine
 from core.workflow.nodes.event import RunCompletedEvent
 from core.workflow.nodes.iteration.iteration_node import IterationNode
 from core.workflow.nodes.template_transform.template_transform_node import TemplateTransformNode
@@ -419,3 +423,143 @@ def test_run_parallel():
                 assert item.run_result.outputs == {"output": ["dify 123", "dify 123"]}
 
         assert count == 32
+
+
+def _init_parallel_iteration_node(error_handle_mode: str) -> IterationNode:
+    graph_config = {
+        "edges": [
+            {
+                "id": "start-source-iteration-1-target",
+                "source": "start",
+                "target": "iteration-1",
+            },
+        ],
+        "nodes": [
+            {"data": {"title": "Start", "type": "start", "variables": []}, "id": "start"},
+            {
+                "data": {
+                    "iterator_selector": ["start", "list"],
+                    "output_selector": ["tt", "output"],
+                    "start_node_id": "tt",
+                    "title": "iteration",
+                    "type": "iteration",
+                    "is_parallel": True,
+                    "parallel_nums": 3,
+                    "error_handle_mode": error_handle_mode,
+                },
+                "id": "iteration-1",
+            },
+            {
+                "data": {
+                    "iteration_id": "iteration-1",
+                    "template": "{{ arg1 }}",
+                    "title": "template transform",
+                    "type": "template-transform",
+                    "variables": [{"value_selector": ["iteration-1", "item"], "variable": "arg1"}],
+                },
+                "id": "tt",
+            },
+        ],
+    }
+
+    init_params = GraphInitParams(
+        tenant_id="1",
+        app_id="1",
+        workflow_type=WorkflowType.WORKFLOW,
+        workflow_id="1",
+        graph_config=graph_config,
+        user_id="1",
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.DEBUGGER,
+        call_depth=0,
+    )
+
+    pool = VariablePool(system_variables={SystemVariableKey.USER_ID: "1"}, user_inputs={})
+    pool.add(["start", "list"], ["item-1", "fail", "item-3", "item-4", "item-5"])
+
+    return IterationNode(
+        id=str(uuid.uuid4()),
+        graph_init_params=init_params,
+        graph=Graph.init(graph_config=graph_config),
+        graph_runtime_state=GraphRuntimeState(variable_pool=pool, start_at=time.perf_counter()),
+        config=graph_config["nodes"][1],
+    )
+
+
+def _tt_item_generator(self):
+    item = self.graph_runtime_state.variable_pool.get(["iteration-1", "item"]).value
+    index = self.graph_runtime_state.variable_pool.get(["iteration-1", "index"]).value
+    # later items finish first
+    time.sleep(0.01 * (5 - index))
+    if item == "fail":
+        return NodeRunResult(status=WorkflowNodeExecutionStatus.FAILED, error="item failed")
+    return NodeRunResult(status=WorkflowNodeExecutionStatus.SUCCEEDED, outputs={"output": f"{item} {index}"})
+
+
+def test_run_parallel_mode_continue_on_error():
+    iteration_node = _init_parallel_iteration_node("continue-on-error")
+
+    with patch.object(TemplateTransformNode, "_run", new=_tt_item_generator):
+        events = list(iteration_node._run())
+
+    result = events[-1]
+    assert isinstance(result, RunCompletedEvent)
+    assert result.run_result.status == WorkflowNodeExecutionStatus.SUCCEEDED
+    # outputs keep the order of the items
+    assert result.run_result.outputs == {"output": ["item-1 0", None, "item-3 2", "item-4 3", "item-5 4"]}
+    # next events carry the index after the finished item, as in sequential mode
+    next_indexes = [event.index for event in events if isinstance(event, IterationRunNextEvent)]
+    assert next_indexes[0] == 0
+    assert sorted(next_indexes[1:]) == [1, 2, 3, 4, 5]
+
+    # items run on forks, the iteration variables never reach the shared pool
+    assert iteration_node.graph_runtime_state.variable_pool.get(["iteration-1", "item"]) is None
+
+
+def test_run_parallel_mode_terminated():
+    iteration_node = _init_parallel_iteration_node("terminated")
+
+    with patch.object(TemplateTransformNode, "_run", new=_tt_item_generator):
+        events = list(iteration_node._run())
+
+    result = events[-1]
+    assert isinstance(result, RunCompletedEvent)
+    assert result.run_result.status == WorkflowNodeExecutionStatus.FAILED
+    assert result.run_result.error == "item failed"
+    assert isinstance(events[-2], IterationRunFailedEvent)
+
+
+def test_run_parallel_item_skipped_after_stop():
+    iteration_node = _init_parallel_iteration_node("terminated")
+    q: queue.Queue = queue.Queue()
+    stop_event = threading.Event()
+    stop_event.set()
+
+    with patch.object(TemplateTransformNode, "_run") as run:
+        iteration_node._run_parallel_item(
+            flask_app=MagicMock(),
+            q=q,
+            stop_event=stop_event,
+            iteration_graph=MagicMock(),
+            thread_pool_id=None,
+            index=0,
+            item="item-1",
+        )
+
+    run.assert_not_called()
+    assert q.empty()
+
+
+def test_run_sequential_item_raises():
+    iteration_node = _init_parallel_iteration_node("terminated")
+    iteration_node.node_data.is_parallel = False
+
+    with patch.object(GraphEngine, "run", side_effect=RuntimeError("engine failed")):
+        events = list(iteration_node._run())
+
+    result = events[-1]
+    assert isinstance(result, RunCompletedEvent)
+    assert result.run_result.status == WorkflowNodeExecutionStatus.FAILED
+    assert result.run_result.error == "engine failed"
+    assert isinstance(events[-2], IterationRunFailedEvent)
+    assert events[-2].error == "engine failed"
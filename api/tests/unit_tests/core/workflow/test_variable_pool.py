@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 from core.file import File, FileTransferMethod, FileType
@@ -43,3 +45,63 @@ def test_use_long_selector(pool):
     result = pool.get(("node_1", "part_1", "part_2"))
     assert result is not None
     assert result.value == "test_value"
+
+
+def test_pools_do_not_share_variables():
+    pool_1 = VariablePool(system_variables={}, user_inputs={})
+    pool_2 = VariablePool(system_variables={}, user_inputs={})
+
+    pool_1.add(("node_1", "var"), "value")
+    assert pool_2.get(("node_1", "var")) is None
+
+
+def test_fork(pool):
+    pool.add(("node_1", "var"), "value")
+    pool.add(("node_2", "var"), "value")
+
+    fork = pool.fork()
+    assert fork.get(("node_1", "var")).value == "value"
+
+    # writes on either side are not visible to the other one
+    fork.add(("node_1", "var"), "fork value")
+    pool.add(("node_2", "var"), "new value")
+    fork.remove(("node_2",))
+    assert pool.get(("node_1", "var")).value == "value"
+    assert fork.get(("node_1", "var")).value == "fork value"
+    assert pool.get(("node_2", "var")).value == "new value"
+    assert fork.get(("node_2", "var")) is None
+
+    # untouched nodes stay shared
+    pool.add(("node_3", "var"), "value")
+    fork_2 = pool.fork()
+    assert fork_2.variable_dictionary["node_3"] is pool.variable_dictionary["node_3"]
+
+
+def test_fork_while_writing(pool):
+    pool.add(("node_1", "var"), 0)
+    stop = threading.Event()
+
+    def write():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            pool.add(("node_1", "var"), value)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        forks = [(fork, fork.get(("node_1", "var")).value) for fork in (pool.fork() for _ in range(1000))]
+    finally:
+        stop.set()
+        writer.join()
+
+    # writes to the pool after a fork are never visible to the fork
+    assert all(fork.get(("node_1", "var")).value == value for fork, value in forks)
+
+
+def test_convert_template(pool):
+    pool.add(("node_1", "var"), "value")
+
+    for _ in range(2):
+        result = pool.convert_template("a {{#node_1.var#}} b {{#node_1.missing#}}")
+        assert result.text == "a value b node_1.missing"
@@ -0,0 +1,29 @@
+import pickle
+
+import numpy as np
+
+from models.dataset import Embedding
+
+
+def test_embedding_float32_round_trip():
+    vector = [0.1, -0.25, 0.5, 1.0]
+    embedding = Embedding(model_name="model", hash="hash", provider_name="provider")
+    embedding.set_embedding(vector)
+
+    assert embedding.embedding[:1] == Embedding.FLOAT32_FORMAT_HEADER
+    assert len(embedding.embedding) == 1 + 4 * len(vector)
+    assert not embedding.is_legacy_format()
+    assert np.allclose(embedding.get_embedding(), vector)
+
+
+def test_embedding_legacy_pickle_still_loads():
+    vector = [0.1, -0.25, 0.5, 1.0]
+    embedding = Embedding(model_name="model", hash="hash", provider_name="provider")
+    embedding.embedding = pickle.dumps(vector, protocol=pickle.HIGHEST_PROTOCOL)
+
+    assert embedding.is_legacy_format()
+    assert embedding.get_embedding() == vector
+
+    embedding.set_embedding(embedding.get_embedding())
+    assert not embedding.is_legacy_format()
+    assert np.allclose(embedding.get_embedding(), vector)